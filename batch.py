@@ -0,0 +1,166 @@
+"""
+Tradução em lote sem interface gráfica (Linux/servidores).
+
+Exemplos:
+    python batch.py https://site/cap-1 https://site/cap-2 --lang 2 --out traduzidos
+    python batch.py ./pasta_cap_10 --lang 1 --engine huggingface --cpu-workers 8
+    python batch.py --from-file capitulos.txt --lang 2 --chapters 2 --browsers 2
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import config
+
+LANGS = {"1": "1", "ja": "1", "jpn": "1", "2": "2", "ko": "2", "kor": "2", "3": "3", "en": "3", "eng": "3"}
+ENGINES = {"google": "google", "huggingface": "huggingface", "hf": "huggingface", "nllb": "huggingface"}
+
+
+class ResourceBudget:
+    """
+    Orçamento global de recursos para vários capítulos ao mesmo tempo.
+
+    cpu_workers:      processos de OCR/desenho somados entre os capítulos
+    model_calls:      capítulos chamando o modelo NLLB ao mesmo tempo (o Google não usa).
+                      Não é quantos modelos ficam carregados: o processo carrega o
+                      NLLB uma vez e todos os capítulos usam a mesma instância
+    browsers:         Chromes abertos (tamanho do pool de navegadores)
+    chapters:         capítulos em andamento ao mesmo tempo
+    """
+
+    def __init__(self, cpu_workers=None, model_calls=1, browsers=1, chapters=None):
+        self.cpu_workers = max(1, cpu_workers or os.cpu_count() or 1)
+        self.model_calls = max(1, model_calls)
+        self.browsers = max(1, browsers)
+        self.chapters = max(1, chapters or max(self.model_calls, self.browsers))
+        self.model_slots = threading.BoundedSemaphore(self.model_calls)
+
+    @property
+    def workers_per_chapter(self):
+        return max(1, self.cpu_workers // self.chapters)
+
+    def apply(self):
+        """Aplica os limites que ficam no config (antes de criar o pool de navegadores)."""
+        config.BROWSER_POOL_SIZE = self.browsers
+
+
+def chapter_name_for(source):
+    """Nome do PDF a partir da URL (último trecho do caminho) ou da pasta."""
+    if os.path.isdir(source):
+        name = os.path.basename(os.path.normpath(source))
+    else:
+        parts = [p for p in urlsplit(source).path.split("/") if p]
+        name = "_".join(parts[-2:]) if parts else urlsplit(source).netloc
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "capitulo"
+
+
+def run_batch(sources, lang_choice, output_folder, engine=None, budget=None, font_path=None):
+    """
+    Traduz vários capítulos (URLs ou pastas) respeitando o orçamento de recursos.
+    Retorna {fonte: caminho_do_pdf ou None}.
+    """
+    from manga_translation_pipeline import translate_chapter
+
+    budget = budget or ResourceBudget()
+    budget.apply()
+    font_path = font_path or config.FONT_PATH
+    results = {}
+
+    def run(source):
+        name = chapter_name_for(source)
+        start = time.time()
+        last = {}
+
+        def progress(stage, cur, tot):
+            # Uma linha por etapa a cada ~10% (não inunda o log)
+            step = int(cur * 10 / tot) if tot else 0
+            if last.get(stage) != step:
+                last[stage] = step
+                print(f"[{name}] {stage}: {cur}/{tot}")
+
+        pdf = translate_chapter(
+            source, lang_choice, output_folder, name,
+            engine=engine,
+            font_path=font_path,
+            workers=budget.workers_per_chapter,
+            callback=progress,
+            model_slot=budget.model_slots,
+        )
+        print(f"[{name}] {'✅' if pdf else '❌'} {time.time() - start:.1f}s")
+        return pdf
+
+    with ThreadPoolExecutor(max_workers=budget.chapters) as pool:
+        futs = {pool.submit(run, src): src for src in sources}
+        for fut in as_completed(futs):
+            src = futs[fut]
+            try:
+                results[src] = fut.result()
+            except Exception as e:
+                print(f"❌ Falha no capítulo {src}: {e}")
+                results[src] = None
+
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Traduz capítulos (URLs ou pastas de imagens) sem interface gráfica.")
+    parser.add_argument("sources", nargs="*", help="URLs de capítulos ou pastas com imagens")
+    parser.add_argument("--from-file", help="arquivo com uma URL/pasta por linha")
+    parser.add_argument("--lang", required=True, help="idioma original: 1/ja, 2/ko, 3/en")
+    parser.add_argument("--engine", default=config.TRANSLATION_MODE, help="google ou huggingface")
+    parser.add_argument("--out", default="traduzidos", help="pasta de saída dos PDFs")
+    parser.add_argument("--font", default=None, help="fonte TrueType para o texto traduzido")
+    parser.add_argument("--cpu-workers", type=int, default=None, help="processos de OCR/desenho (total)")
+    parser.add_argument("--model-calls", "--models", dest="model_calls", type=int, default=1,
+                        help="capítulos chamando o modelo NLLB ao mesmo tempo (o modelo é carregado uma vez só)")
+    parser.add_argument("--browsers", type=int, default=1, help="Chromes abertos ao mesmo tempo")
+    parser.add_argument("--chapters", type=int, default=None, help="capítulos em andamento ao mesmo tempo")
+    args = parser.parse_args(argv)
+
+    sources = list(args.sources)
+    if args.from_file:
+        with open(args.from_file, encoding="utf-8") as f:
+            sources += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not sources:
+        parser.error("informe pelo menos uma URL ou pasta")
+
+    lang = LANGS.get(str(args.lang).lower())
+    if not lang:
+        parser.error(f"idioma inválido: {args.lang}")
+
+    engine = ENGINES.get(args.engine.lower())
+    if not engine:
+        parser.error(f"motor inválido: {args.engine}")
+
+    return args, sources, lang, engine
+
+
+def main(argv=None):
+    args, sources, lang, engine = parse_args(argv)
+
+    budget = ResourceBudget(
+        cpu_workers=args.cpu_workers,
+        model_calls=args.model_calls,
+        browsers=args.browsers,
+        chapters=args.chapters,
+    )
+    print(f"🚀 {len(sources)} capítulo(s) • motor: {engine} • {budget.chapters} ao mesmo tempo • "
+          f"{budget.workers_per_chapter} processo(s) por capítulo")
+
+    results = run_batch(sources, lang, args.out, engine=engine, budget=budget, font_path=args.font)
+
+    ok = sum(1 for pdf in results.values() if pdf)
+    print(f"\n📚 {ok}/{len(results)} capítulo(s) traduzido(s)")
+    for src, pdf in results.items():
+        print(f"  {'✅' if pdf else '❌'} {src}" + (f" → {pdf}" if pdf else ""))
+
+    return 0 if ok == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Benchmark: detecção de balões na resolução original × página reduzida + refino.
+
+Roda detect_balloons_contours com scale=1 (como antes) e com DETECT_SCALE
+num conjunto de páginas e confere se as caixas batem: cada caixa da resolução
+original precisa de uma caixa da detecção reduzida com todos os lados a até
+TOL px. Mostra o tempo por página e as caixas que faltaram/sobraram.
+
+Sem pasta, usa páginas sintéticas (balões de vários tamanhos e formatos, com
+texto, sobre arte com traços e retícula). Com uma pasta, usa as imagens dela.
+
+Uso:
+    python benchmarks/bench_balloon_detection.py [pasta_com_paginas] [--tol 4]
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DETECT_SCALE  # noqa: E402
+from ocr_balloon import detect_balloons_contours, page_gray  # noqa: E402
+
+
+def make_page(seed, width=800, height=3000):
+    rng = np.random.default_rng(seed)
+    # Arte colorida (gradiente + ruído), com retícula em alguns quadros
+    ramp = np.linspace(90, 180, height, dtype=np.float32)[:, None, None]
+    page = (ramp + rng.normal(0, 20, (height, width, 3))).clip(0, 255).astype(np.uint8)
+    for _ in range(4):
+        x, y = int(rng.integers(0, width - 300)), int(rng.integers(0, height - 300))
+        page[y:y + 300:4, x:x + 300:4] = 235
+    for _ in range(40):
+        p1 = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        p2 = (p1[0] + int(rng.integers(-200, 200)), p1[1] + int(rng.integers(-200, 200)))
+        cv2.line(page, p1, p2, (30, 30, 30), int(rng.integers(1, 5)))
+
+    y = 60
+    while y < height - 200:
+        rx, ry = int(rng.integers(70, 220)), int(rng.integers(45, 110))
+        cx = int(rng.integers(rx + 10, width - rx - 10))
+        cy = y + ry
+        if rng.random() < 0.7:
+            cv2.ellipse(page, (cx, cy), (rx, ry), 0, 0, 360, (255, 255, 255), -1)
+            cv2.ellipse(page, (cx, cy), (rx, ry), 0, 0, 360, (0, 0, 0), 2)
+        else:
+            cv2.rectangle(page, (cx - rx, cy - ry), (cx + rx, cy + ry), (255, 255, 255), -1)
+            cv2.rectangle(page, (cx - rx, cy - ry), (cx + rx, cy + ry), (0, 0, 0), 2)
+        for k in range(max(1, ry // 30)):
+            cv2.putText(page, "HELLO THERE", (cx - rx // 2, cy - ry // 3 + k * 28),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+        y = cy + ry + int(rng.integers(30, 250))
+    return page
+
+
+def load_pages(folder):
+    pages = []
+    for name in sorted(os.listdir(folder)):
+        img = cv2.imread(os.path.join(folder, name))
+        if img is not None:
+            pages.append(img)
+    return pages
+
+
+def compare(full, scaled, tol):
+    """(caixas que faltaram, caixas a mais) com tolerância de tol px por lado."""
+    def close(a, b):
+        ax, ay, aw, ah = a
+        bx, by, bw, bh = b
+        return max(abs(ax - bx), abs(ay - by), abs(ax + aw - bx - bw), abs(ay + ah - by - bh)) <= tol
+
+    missed = [a for a in full if not any(close(a, b) for b in scaled)]
+    extra = [b for b in scaled if not any(close(a, b) for a in full)]
+    return missed, extra
+
+
+def main():
+    args = sys.argv[1:]
+    tol = 4
+    if "--tol" in args:
+        i = args.index("--tol")
+        tol = int(args[i + 1])
+        del args[i:i + 2]
+
+    pages = load_pages(args[0]) if args else [make_page(seed) for seed in range(12)]
+    grays = [page_gray(p) for p in pages]
+
+    results = {}
+    for label, scale in (("original", 1), (f"reduzida {DETECT_SCALE}", DETECT_SCALE)):
+        start = time.perf_counter()
+        results[scale] = [detect_balloons_contours(p, gray=g, scale=scale) for p, g in zip(pages, grays)]
+        elapsed = (time.perf_counter() - start) / len(pages)
+        print(f"{label:14s} {elapsed * 1000:7.1f} ms/página  "
+              f"({sum(len(b) for b in results[scale])} balões em {len(pages)} páginas)")
+
+    total_missed = total_extra = 0
+    for i, (full, scaled) in enumerate(zip(results[1], results[DETECT_SCALE])):
+        missed, extra = compare(full, scaled, tol)
+        total_missed += len(missed)
+        total_extra += len(extra)
+        if missed or extra:
+            print(f"  página {i}: faltaram {missed}  a mais {extra}")
+
+    status = "✅" if not (total_missed or total_extra) else "⚠️"
+    print(f"{status} tolerância {tol}px: {total_missed} faltaram, {total_extra} a mais")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark do download HTTP contra um servidor local (substituto do CDN).
+
+O servidor responde com latência artificial, falha de forma intermitente
+(503 na primeira tentativa de algumas imagens) e devolve 404 para outras,
+para exercitar o retry com backoff e o fallback.
+
+Compara:
+    - antigo: requests.get sequencial, sem sessão, retry imediato
+    - novo:   http_fetch.fetch_many (sessão compartilhada, paralelo, backoff)
+
+Uso:
+    python benchmarks/bench_http_fetch.py [n_imagens] [latencia_ms]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_fetch  # noqa: E402
+
+PAYLOAD = os.urandom(300 * 1024)
+
+
+def make_handler(latency, flaky, missing):
+    seen = set()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            name = self.path.strip("/")
+            with lock:
+                first = name not in seen
+                seen.add(name)
+
+            if name in missing:
+                self.send_response(404)
+                self.end_headers()
+                return
+            if name in flaky and first:
+                self.send_response(503)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(PAYLOAD)))
+            self.end_headers()
+            self.wfile.write(PAYLOAD)
+
+    return Handler, seen
+
+
+def serve(latency, flaky, missing):
+    handler, seen = make_handler(latency, flaky, missing)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, seen
+
+
+def legacy(jobs, max_retries=3):
+    ok = 0
+    for _, url, path in jobs:
+        for _ in range(max_retries):
+            try:
+                r = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
+                if r.status_code == 200:
+                    with open(path, "wb") as f:
+                        f.write(r.content)
+                    ok += 1
+                    break
+            except:
+                pass
+    return ok
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 80) / 1000
+
+    names = [f"{i:03}.jpg" for i in range(1, n + 1)]
+    flaky = set(names[::7])
+    missing = {names[-1]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("antigo", "novo"):
+            server, _ = serve(latency, flaky, missing)
+            base = f"http://127.0.0.1:{server.server_address[1]}/"
+            jobs = [(i, base + name, os.path.join(tmp, f"{label}_{name}")) for i, name in enumerate(names)]
+
+            start = time.perf_counter()
+            if label == "antigo":
+                ok = legacy(jobs)
+            else:
+                results = dict(http_fetch.fetch_many(jobs, session=http_fetch.build_session(), backoff=0.05))
+                ok = sum(1 for v in results.values() if v)
+                failed = [names[k] for k, v in results.items() if not v]
+            elapsed = time.perf_counter() - start
+            server.shutdown()
+
+            print(f"{label:7s} {elapsed:6.2f}s  ok={ok}/{n}")
+
+        print(f"falhas enviadas ao fallback do navegador: {failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: NLLB na CPU — qualidade × latência.
+
+Traduz um corpus fixo de falas de balão (fixtures/balloon_texts_en.txt) com
+cada combinação de dtype (float32 / int8 dinâmico) e decodificação (beam 4 /
+greedy) e mostra, para cada uma:
+    - tempo de carga e memória do modelo
+    - ms por texto (lotes de TRANSLATION_BATCH_SIZE, como no pipeline)
+    - chrF contra a saída de referência (float32 + beam 4, a configuração antiga)
+
+Precisa do torch, do transformers e do modelo em NLLB_MODEL_DIR.
+
+Uso:
+    python benchmarks/bench_nllb_cpu.py [threads] [repeticoes]
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from translator_nllb import TranslatorNLLB  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "balloon_texts_en.txt")
+
+CONFIGS = [
+    ("float32", 4),
+    ("float32", 1),
+    ("qint8", 4),
+    ("qint8", 1),
+]
+
+
+def chrf(hypothesis, reference, n=6, beta=2.0):
+    """chrF (n-gramas de caracteres, média de 1..n, F com peso beta no recall), 0-100."""
+    hyp, ref = hypothesis.replace(" ", ""), reference.replace(" ", "")
+    precisions, recalls = [], []
+    for k in range(1, n + 1):
+        h = Counter(hyp[i:i + k] for i in range(len(hyp) - k + 1))
+        r = Counter(ref[i:i + k] for i in range(len(ref) - k + 1))
+        if not h or not r:
+            continue
+        match = sum((h & r).values())
+        precisions.append(match / sum(h.values()))
+        recalls.append(match / sum(r.values()))
+    if not precisions:
+        return 100.0 if hyp == ref else 0.0
+
+    p, r = sum(precisions) / len(precisions), sum(recalls) / len(recalls)
+    if p + r == 0:
+        return 0.0
+    return 100 * (1 + beta ** 2) * p * r / (beta ** 2 * p + r)
+
+
+def main():
+    if len(sys.argv) > 1:
+        config.NLLB_CPU_THREADS = int(sys.argv[1])
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+    with open(CORPUS, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    reference = None
+    for dtype, beams in CONFIGS:
+        translator = TranslatorNLLB("eng_Latn", "por_Latn", device="cpu", dtype=dtype, num_beams=beams)
+        translator.translate_batch(texts[:2])  # aquecimento
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            output = translator.translate_batch(texts)
+        elapsed = (time.perf_counter() - start) / (repeat * len(texts))
+
+        if reference is None:
+            reference = output
+        score = sum(chrf(h, r) for h, r in zip(output, reference)) / len(texts)
+
+        loaded = translator.loaded
+        label = f"{dtype} {'greedy' if beams == 1 else f'beam {beams}'}"
+        print(f"{label:16s} {elapsed * 1000:7.1f} ms/texto • chrF {score:5.1f} • "
+              f"carga {loaded.load_seconds:5.1f}s • {loaded.memory_bytes / 1e9:.2f} GB")
+
+    print(f"({len(texts)} textos, {config.TRANSLATION_BATCH_SIZE} por lote)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: OCR da página em uma passada × OCR por balão + página inteira.
+
+Gera uma página sintética (balões brancos com texto + texto solto sobre um
+fundo cinza) e roda ocr_page_regions nos dois modos, com o cache de OCR
+desligado. Mostra o tempo, quantas chamadas ao Tesseract cada modo fez e os
+textos encontrados. Precisa do Tesseract instalado (e do traineddata "eng").
+
+Uso:
+    python benchmarks/bench_ocr_single_pass.py [n_baloes] [repeticoes]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+config.OCR_CACHE_ENABLED = False
+
+import ocr_balloon  # noqa: E402
+from ocr_backend import get_ocr_backend  # noqa: E402
+
+LINES = ["WHERE ARE YOU", "GOING NOW?", "I TOLD YOU", "TO WAIT HERE"]
+
+
+def make_page(n_balloons, width=800):
+    height = 420 * n_balloons + 200
+    page = Image.new("RGB", (width, height), (150, 150, 150))
+    draw = ImageDraw.Draw(page)
+    try:
+        font = ImageFont.truetype("DejaVuSans-Bold.ttf", 26)
+    except OSError:
+        font = ImageFont.load_default()
+
+    for i in range(n_balloons):
+        cx, cy = 260 + (i % 2) * 260, 200 + i * 420
+        draw.ellipse((cx - 200, cy - 110, cx + 200, cy + 110), fill=(255, 255, 255))
+        for k, line in enumerate(LINES[:2] if i % 2 else LINES[2:]):
+            draw.text((cx - 110, cy - 35 + k * 36), line, fill=(0, 0, 0), font=font)
+        # Texto solto sobre a arte
+        draw.text((40, cy + 150), f"SFX {i}", fill=(10, 10, 10), font=font)
+
+    return np.array(page)[:, :, ::-1].copy()
+
+
+class CountingBackend:
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = 0
+
+    def image_to_string(self, *args, **kwargs):
+        self.calls += 1
+        return self.inner.image_to_string(*args, **kwargs)
+
+    def image_to_data(self, *args, **kwargs):
+        self.calls += 1
+        return self.inner.image_to_data(*args, **kwargs)
+
+    def version(self):
+        return self.inner.version()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    img = make_page(n)
+    backend = CountingBackend(get_ocr_backend())
+    ocr_balloon.get_ocr_backend = lambda: backend
+
+    for label, single in (("por balão", False), ("uma passada", True)):
+        backend.calls = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            regions = ocr_balloon.ocr_page_regions(img, "eng", single_pass=single)
+        elapsed = (time.perf_counter() - start) / repeat
+
+        print(f"{label:12s} {elapsed:6.2f}s/página  chamadas ao Tesseract: {backend.calls // repeat}")
+        for r in regions:
+            print(f"    {r['kind']:7s} {r['text'].strip()!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: passagem das páginas entre etapas (disco × memória).
+
+Simula o caminho de uma página sem OCR nem tradução (só I/O):
+    - disco:   arquivo baixado → cv2.imread → desenho → cv2.imwrite (PNG) → PDF relê o PNG
+    - memória: bytes baixados → cv2.imdecode → desenho → array direto para o PDF
+
+Metade das páginas recebe um "balão" desenhado; a outra metade não tem texto
+(na memória elas vão para o PDF com os bytes JPEG originais, sem decodificar).
+Mostra o tempo total e os contadores de codificação/decodificação por etapa.
+
+Uso:
+    python benchmarks/bench_page_handoff.py [n_paginas] [altura]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_balloon import load_page_image, save_page_output  # noqa: E402
+from page_buffer import IO_STATS, Page  # noqa: E402
+from pdf import StreamingPdfWriter  # noqa: E402
+from workspace import Workspace  # noqa: E402
+
+
+def make_pages(folder, n, height):
+    """Tiras longas em JPEG, como as baixadas dos sites."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(1, n + 1):
+        img = np.full((height, 720, 3), 235, np.uint8)
+        for _ in range(40):
+            y, x = int(rng.integers(0, height - 200)), int(rng.integers(0, 520))
+            cv2.rectangle(img, (x, y), (x + 200, y + 200), tuple(int(c) for c in rng.integers(0, 255, 3)), -1)
+        path = os.path.join(folder, f"{i:03}.png")
+        # Mesmo nome .png do down.py, com os bytes originais (JPEG) do site
+        with open(path, "wb") as f:
+            f.write(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes())
+        paths.append(path)
+    return paths
+
+
+def fake_render(img, i):
+    if i % 2:
+        return img, False
+    cv2.rectangle(img, (100, 100), (400, 300), (255, 255, 255), -1)
+    cv2.putText(img, "traduzido", (120, 220), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    return img, True
+
+
+def run(paths, ws, in_memory):
+    pdf_path = os.path.join(ws.root, "memoria.pdf" if in_memory else "disco.pdf")
+    before = IO_STATS.snapshot()
+    start = time.perf_counter()
+
+    with StreamingPdfWriter(pdf_path) as writer:
+        for i, path in enumerate(paths):
+            source = Page.from_file(path) if in_memory else path
+            img = load_page_image(source)
+            img, changed = fake_render(img, i)
+            out = save_page_output(source, img, ws, changed=changed)
+            writer.add_page(out)
+
+    elapsed = time.perf_counter() - start
+    return elapsed, IO_STATS.since(before), os.path.getsize(pdf_path)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ws = Workspace(root=tmp)
+        paths = make_pages(ws.download_dir, n, height)
+
+        for label, in_memory in (("disco", False), ("memória", True)):
+            elapsed, stats, size = run(paths, ws, in_memory)
+            print(f"{label:8s} {elapsed:6.2f}s  PDF {size / 1e6:5.1f} MB")
+            print(f"         {IO_STATS.format(stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark da coleta de imagens com Selenium contra uma página local com lazy-load.
+
+Serve benchmarks/fixtures/lazy_chapter.html (placeholders + data-src + scroll
+infinito) e compara:
+    - antigo: sleep(3) + rolagem com sleep(1.5) até a altura parar de mudar
+    - novo:   page_harvest.harvest_image_candidates (espera por eventos)
+
+Mede o tempo de coleta e quantas das N páginas cada método encontrou.
+Precisa do Chrome/ChromeDriver (CHROMEDRIVER_PATH do config.py ou o do PATH).
+
+Uso:
+    python benchmarks/bench_page_harvest.py [n_paginas] [atraso_max_ms]
+"""
+import functools
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from page_harvest import harvest_image_candidates  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "lazy_chapter.html")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def build_site(folder, n):
+    shutil.copy(FIXTURE, os.path.join(folder, "index.html"))
+    os.makedirs(os.path.join(folder, "img"))
+    for i in range(1, n + 1):
+        Image.new("RGB", (720, 1200), (i * 7 % 255, 200, 200)).save(os.path.join(folder, "img", f"{i:03}.png"))
+
+
+def make_driver():
+    opts = Options()
+    opts.add_argument("--headless=new")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--window-size=1280,900")
+    if os.path.isfile(config.CHROMEDRIVER_PATH):
+        return webdriver.Chrome(service=Service(config.CHROMEDRIVER_PATH), options=opts)
+    return webdriver.Chrome(options=opts)
+
+
+def legacy_harvest(driver, url):
+    """Cópia do fluxo antigo de down.py (esperas fixas)."""
+    driver.get(url)
+    time.sleep(3)
+    last_height = driver.execute_script("return document.body.scrollHeight")
+    while True:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(1.5)
+        new_height = driver.execute_script("return document.body.scrollHeight")
+        if new_height == last_height:
+            break
+        last_height = new_height
+
+    found = []
+    for img in driver.find_elements(By.TAG_NAME, "img"):
+        src = img.get_attribute("src") or img.get_attribute("data-src") or ""
+        if img.size.get("width", 0) >= 200 and img.size.get("height", 0) >= 200:
+            found.append(src)
+    return found
+
+
+def count_real(srcs, n):
+    wanted = {f"img/{i:03}.png" for i in range(1, n + 1)}
+    return len({s.split("/", 3)[-1] for s in srcs} & wanted)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    delay = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+
+    with tempfile.TemporaryDirectory() as site:
+        build_site(site, n)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=site))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/index.html?pages={n}&delay={delay}"
+
+        driver = make_driver()
+        try:
+            start = time.perf_counter()
+            old = legacy_harvest(driver, url)
+            old_t = time.perf_counter() - start
+
+            start = time.perf_counter()
+            new = [c["src"] for c in harvest_image_candidates(driver, url)]
+            new_t = time.perf_counter() - start
+        finally:
+            driver.quit()
+            server.shutdown()
+
+    print(f"antigo: {old_t:6.1f}s  páginas reais encontradas: {count_real(old, n)}/{n}")
+    print(f"novo:   {new_t:6.1f}s  páginas reais encontradas: {count_real(new, n)}/{n}")
+
+
+if __name__ == "__main__":
+    main()
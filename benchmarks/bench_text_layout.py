@@ -0,0 +1,123 @@
+"""
+Microbenchmark: ajuste de texto no balão (draw_text_in_box).
+
+Compara o algoritmo antigo (fonte recarregada a cada passo de 2px + textbbox
+por linha candidata) com text_layout.layout_text (cache de fontes, tabela de
+avanços por glifo, busca binária e memorização).
+
+Uso:
+    python benchmarks/bench_text_layout.py [caminho_da_fonte.ttf]
+"""
+import os
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import text_layout  # noqa: E402
+
+# Traduções reais de balões (pt-BR) com os tamanhos de box em que apareceram
+BALLOONS = [
+    ("O quê?!", (120, 60)),
+    ("...", (80, 40)),
+    ("Ei, espera aí! Você não pode simplesmente ir embora assim!", (220, 140)),
+    ("Eu já te disse mil vezes que não vou voltar para aquela casa.", (260, 160)),
+    ("Hã?", (90, 50)),
+    ("Técnica secreta: Lâmina do Dragão Celestial!", (300, 120)),
+    ("Se você continuar assim, vai acabar se machucando de verdade.", (200, 180)),
+    ("Obrigado... de verdade.", (150, 90)),
+    ("Não! Não! Não! Isso não pode estar acontecendo comigo agora!", (240, 200)),
+    ("Vamos logo, o trem sai em cinco minutos!", (210, 110)),
+    ("Hmm... interessante. Muito interessante.", (180, 100)),
+    ("Quem é você?", (130, 70)),
+]
+
+
+def _legacy_get_font(font_path, size):
+    try:
+        return ImageFont.truetype(font_path, size)
+    except:
+        return ImageFont.load_default()
+
+
+def legacy_layout(draw, text, w, h, font_path):
+    """Cópia do laço original de draw_text_in_box (só a parte de ajuste)."""
+    font_size = int(h * 0.4)
+    font = _legacy_get_font(font_path, font_size)
+    lines = []
+    while font_size > 8:
+        font = _legacy_get_font(font_path, font_size)
+        words = text.split()
+        lines = []
+        current_line = ""
+        for word in words:
+            test_line = f"{current_line} {word}".strip()
+            bbox = draw.textbbox((0, 0), test_line, font=font)
+            line_w = bbox[2] - bbox[0]
+            if line_w < (w - 4):
+                current_line = test_line
+            else:
+                lines.append(current_line)
+                current_line = word
+        if current_line: lines.append(current_line)
+        total_h = sum([draw.textbbox((0, 0), l, font=font)[3] - draw.textbbox((0, 0), l, font=font)[1] + 4 for l in lines])
+        if total_h <= (h - 4):
+            break
+        font_size -= 2
+    return font_size, lines
+
+
+def _find_font():
+    candidates = [
+        sys.argv[1] if len(sys.argv) > 1 else None,
+        os.environ.get("FONT_PATH"),
+        r"C:\Windows\Fonts\arial.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/Library/Fonts/Arial.ttf",
+    ]
+    for c in candidates:
+        if c and os.path.isfile(c):
+            return c
+    return None
+
+
+def bench(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text, (w, h) in BALLOONS:
+            fn(text, w, h)
+    return (time.perf_counter() - start) / (rounds * len(BALLOONS)) * 1000
+
+
+def main(rounds=20):
+    font_path = _find_font()
+    print(f"Fonte: {font_path or 'padrão do PIL'}")
+
+    draw = ImageDraw.Draw(Image.new("RGB", (10, 10)))
+
+    legacy_ms = bench(lambda t, w, h: legacy_layout(draw, t, w, h, font_path), rounds)
+
+    # Frio: sem memorização de layout (mas com cache de fonte/glifos, como numa página nova)
+    def cold(t, w, h):
+        text_layout.layout_text.cache_clear()
+        text_layout.layout_text(t, w, h, font_path)
+
+    cold_ms = bench(cold, rounds)
+    warm_ms = bench(lambda t, w, h: text_layout.layout_text(t, w, h, font_path), rounds)
+
+    print(f"Antigo:              {legacy_ms:8.3f} ms/balão")
+    print(f"Novo (sem memo):     {cold_ms:8.3f} ms/balão  ({legacy_ms / cold_ms:5.1f}x)")
+    print(f"Novo (memorizado):   {warm_ms:8.3f} ms/balão  ({legacy_ms / warm_ms:5.1f}x)")
+
+    # Comparação do tamanho escolhido (o antigo anda de 2 em 2px, o novo de 1 em 1)
+    print("\nTamanho de fonte escolhido (antigo → novo):")
+    for text, (w, h) in BALLOONS:
+        old_size, _ = legacy_layout(draw, text, w, h, font_path)
+        new_size = text_layout.layout_text(text, w, h, font_path)[0]
+        print(f"  {old_size:3d} → {new_size:3d}   {text[:40]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark: filtro de tinta antes do OCR (precisão/recall + tempo).
+
+Roda text_presence.has_text em recortes rotulados:
+    - com texto: balões com 1-3 linhas (vários tamanhos), palavra curta,
+      texto pequeno, texto claro com contorno sobre a arte
+    - sem texto: balão vazio, painel branco, céu em degradê, calha entre
+      quadros, retícula, linhas de velocidade
+Recall baixo = texto perdido (o filtro pulou um balão com fala); precisão
+baixa = chamadas ao Tesseract que não precisavam acontecer.
+
+Com uma pasta, usa os recortes dela: <pasta>/text/*.png e <pasta>/empty/*.png.
+
+Uso:
+    python benchmarks/bench_text_prefilter.py [pasta_rotulada] [--min 1]
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_presence import has_text, text_components  # noqa: E402
+
+WORDS = ["WHAT?", "I TOLD YOU", "WAIT HERE", "NO WAY...", "OK", "LET'S GO!", "HUH"]
+
+
+def balloon(rng, w, h):
+    """Balão branco com contorno, arte ruidosa nos cantos da caixa."""
+    img = (rng.normal(120, 35, (h, w, 1))).clip(0, 255).astype(np.uint8).repeat(3, axis=2)
+    cv2.ellipse(img, (w // 2, h // 2), (w // 2 - 1, h // 2 - 1), 0, 0, 360, (255, 255, 255), -1)
+    cv2.ellipse(img, (w // 2, h // 2), (w // 2 - 1, h // 2 - 1), 0, 0, 360, (0, 0, 0), 2)
+    return img
+
+
+def put_lines(img, rng, n_lines, scale, thickness, color=(0, 0, 0)):
+    h, w = img.shape[:2]
+    font = [cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX, cv2.FONT_HERSHEY_COMPLEX][int(rng.integers(0, 3))]
+    line_h = int(30 * scale) + 6
+    y = h // 2 - (n_lines * line_h) // 2 + line_h
+    for _ in range(n_lines):
+        text = WORDS[int(rng.integers(0, len(WORDS)))]
+        tw = cv2.getTextSize(text, font, scale, thickness)[0][0]
+        cv2.putText(img, text, ((w - tw) // 2, y), font, scale, color, thickness)
+        y += line_h
+    return img
+
+
+def make_fixtures(n=40, seed=0):
+    """Lista de (rótulo, nome, recorte em tons de cinza); rótulo True = tem texto."""
+    rng = np.random.default_rng(seed)
+    items = []
+    for i in range(n):
+        w, h = int(rng.integers(160, 420)), int(rng.integers(90, 240))
+
+        # ---------- com texto ----------
+        img = put_lines(balloon(rng, w, h), rng, int(rng.integers(1, 4)), rng.uniform(0.5, 1.0), 2)
+        items.append((True, f"balão {i}", img))
+
+        img = put_lines(balloon(rng, w, h), rng, 1, rng.uniform(0.35, 0.45), 1)
+        items.append((True, f"texto pequeno {i}", img))
+
+        img = balloon(rng, w, h)
+        cv2.putText(img, "?!", (w // 2 - 15, h // 2 + 10), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 3)
+        items.append((True, f"palavra curta {i}", img))
+
+        art = (rng.normal(90, 30, (h, w, 1))).clip(0, 255).astype(np.uint8).repeat(3, axis=2)
+        put_lines(art, rng, 1, 1.0, 7, (0, 0, 0))
+        art2 = art.copy()
+        put_lines(art2, np.random.default_rng(i), 1, 1.0, 2, (255, 255, 255))
+        items.append((True, f"texto sobre arte {i}", art2))
+
+        # ---------- sem texto ----------
+        items.append((False, f"balão vazio {i}", balloon(rng, w, h)))
+
+        panel = (250 + rng.normal(0, 2, (h, w, 1))).clip(0, 255).astype(np.uint8).repeat(3, axis=2)
+        items.append((False, f"painel branco {i}", panel))
+
+        sky = np.linspace(rng.uniform(150, 200), 255, h, dtype=np.float32)[:, None, None]
+        sky = (sky + rng.normal(0, 2, (h, w, 1))).clip(0, 255).astype(np.uint8).repeat(3, axis=2)
+        items.append((False, f"céu {i}", sky))
+
+        gutter = np.full((h, w, 3), 255, np.uint8)
+        cv2.rectangle(gutter, (-5, -5), (w // 3, h + 5), (0, 0, 0), 3)
+        cv2.rectangle(gutter, (w // 3 + 20, -5), (w + 5, h + 5), (0, 0, 0), 3)
+        items.append((False, f"calha {i}", gutter))
+
+        tone = np.full((h, w, 3), 255, np.uint8)
+        tone[::4, ::4] = 100
+        items.append((False, f"retícula {i}", tone))
+
+        speed = np.full((h, w, 3), 255, np.uint8)
+        for _ in range(6):
+            y = int(rng.integers(0, h))
+            cv2.line(speed, (0, y), (w, y + int(rng.integers(-20, 20))), (0, 0, 0), 1)
+        items.append((False, f"linhas de velocidade {i}", speed))
+
+    return [(label, name, cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)) for label, name, img in items]
+
+
+def load_fixtures(folder):
+    items = []
+    for sub, label in (("text", True), ("empty", False)):
+        path = os.path.join(folder, sub)
+        for name in sorted(os.listdir(path)):
+            img = cv2.imread(os.path.join(path, name), cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                items.append((label, f"{sub}/{name}", img))
+    return items
+
+
+def main():
+    args = sys.argv[1:]
+    min_components = 1
+    if "--min" in args:
+        i = args.index("--min")
+        min_components = int(args[i + 1])
+        del args[i:i + 2]
+
+    items = load_fixtures(args[0]) if args else make_fixtures()
+
+    start = time.perf_counter()
+    predicted = [has_text(gray, min_components) for _, _, gray in items]
+    elapsed = (time.perf_counter() - start) / len(items)
+
+    tp = sum(1 for (label, _, _), p in zip(items, predicted) if label and p)
+    fp = sum(1 for (label, _, _), p in zip(items, predicted) if not label and p)
+    fn = sum(1 for (label, _, _), p in zip(items, predicted) if label and not p)
+    skipped = sum(1 for p in predicted if not p)
+
+    for (label, name, gray), p in zip(items, predicted):
+        if label != p:
+            kind = "texto perdido" if label else "falso positivo"
+            print(f"  {kind:14s} {name} ({text_components(gray)} componentes)")
+
+    print(f"{len(items)} recortes • {elapsed * 1000:.2f} ms/recorte • mínimo {min_components} componentes")
+    print(f"precisão {tp / max(tp + fp, 1):.1%} • recall {tp / max(tp + fn, 1):.1%} • "
+          f"chamadas ao OCR evitadas: {skipped}/{len(items)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import atexit
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+import config
+
+
+# ---------------------------------------------------------
+# 🔧 Configurações do Chrome (estável)
+# ---------------------------------------------------------
+def build_chrome_options():
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--log-level=3")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option("useAutomationExtension", False)
+    return chrome_options
+
+
+def new_driver():
+    if not os.path.isfile(config.CHROMEDRIVER_PATH):
+        raise FileNotFoundError(f"❌ CHROMEDRIVER_PATH inválido:\n{config.CHROMEDRIVER_PATH}")
+
+    return webdriver.Chrome(
+        service=Service(config.CHROMEDRIVER_PATH),
+        options=build_chrome_options()
+    )
+
+
+class BrowserPool:
+    """
+    Mantém até `size` Chromes headless abertos entre capítulos.
+
+    - borrow() empresta um driver (abre um novo só se não houver nenhum livre)
+    - na devolução: fecha abas extras, apaga cookies/storage e volta para about:blank
+    - o driver é descartado depois de `max_pages` páginas (add_pages) ou se der
+      erro do WebDriver
+    """
+
+    def __init__(self, size=None, max_pages=None, factory=new_driver):
+        self.size = size or config.BROWSER_POOL_SIZE
+        self.max_pages = max_pages or config.BROWSER_MAX_PAGES
+        self.factory = factory
+
+        self._idle = queue.LifoQueue()
+        self._pages = {}
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.created = 0
+        self.recycled = 0
+
+    @contextmanager
+    def borrow(self):
+        self._slots.acquire()
+        driver = None
+        broken = False
+        try:
+            driver = self._take()
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            if driver is not None:
+                self._give_back(driver, broken)
+            self._slots.release()
+
+    def add_pages(self, driver, count):
+        """Conta páginas baixadas com o driver (a reciclagem acontece na devolução)."""
+        with self._lock:
+            if id(driver) in self._pages:
+                self._pages[id(driver)] += count
+
+    # ------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------
+    def _take(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            # Chrome que morreu enquanto estava parado → descarta
+            try:
+                driver.current_url
+                return driver
+            except Exception:
+                self._quit(driver)
+
+        driver = self.factory()
+        with self._lock:
+            self._pages[id(driver)] = 0
+            self.created += 1
+        return driver
+
+    def _give_back(self, driver, broken):
+        with self._lock:
+            pages = self._pages.get(id(driver), 0)
+
+        if broken or self._closed or pages >= self.max_pages:
+            self.recycled += 1
+            self._quit(driver)
+            return
+
+        try:
+            self._reset(driver)
+        except Exception:
+            self.recycled += 1
+            self._quit(driver)
+            return
+
+        self._idle.put(driver)
+
+    @staticmethod
+    def _reset(driver):
+        # Fecha abas extras (popups de anúncio etc.)
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        try:
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        except Exception:
+            pass
+
+        # Cookies de todos os domínios (delete_all_cookies só limpa o domínio atual)
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except Exception:
+            driver.delete_all_cookies()
+
+        driver.get("about:blank")
+
+    def _quit(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+# ------------------------------------------------------------
+# Pool compartilhado pelo processo
+# ------------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
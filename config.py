@@ -4,6 +4,11 @@ import pytesseract
 # Caminho do Tesseract
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
+# Motor de OCR: "auto" (tesserocr se instalado, senão pytesseract), "tesserocr" ou "pytesseract"
+# tesserocr mantém o Tesseract carregado no processo (sem abrir um processo por balão)
+OCR_BACKEND = "auto"
+TESSDATA_PATH = None  # None = pasta tessdata ao lado do tesseract.exe
+
 # Caminho do ChromeDriver
 CHROMEDRIVER_PATH = r"C:\Users\Henrique\Downloads\chromedriver-win64\chromedriver-win64\chromedriver.exe"
 
@@ -14,14 +19,73 @@ FONT_PATH = None  # exemplo: r"C:\Windows\Fonts\arial.ttf"
 TEMP_FOLDER = "capitulo_temp"
 TEMP_OUT = TEMP_FOLDER + "_out"
 
+# Pasta de trabalho por execução (cada capítulo ganha uma subpasta própria)
+WORKSPACE_ROOT = None         # None = pasta temporária do sistema
+WORKSPACE_TMPFS = False       # True = usa /dev/shm (Linux) quando existir
+WORKSPACE_CLEANUP = "on_success"  # "always" | "on_success" (mantém se der erro) | "never"
+
+# Páginas passam entre as etapas na memória (bytes originais / arrays),
+# sem gravar PNG entre download → OCR → desenho → PDF
+PAGES_IN_MEMORY = True
+SAVE_DEBUG_PAGES = False      # True = grava também cada página traduzida no workspace
+
+# Jobs retomáveis: manifesto por página (download, OCR, traduções, saída).
+# Rodar o mesmo capítulo de novo pula as páginas prontas e refaz só as que falharam/mudaram.
+RESUMABLE_JOBS = True
+JOBS_FOLDER = "jobs"
+JOBS_KEEP_DONE = False        # True = mantém o job mesmo depois do PDF completo
+JOBS_PARTIAL_RETRIES = 1      # execuções que retraduzem textos que voltaram iguais; depois a página fica pronta
+
 # ⚠️ IMPORTANTE:
 # NÃO criar pastas aqui, pois isso gera conflitos no Windows
 # Elas serão criadas no down.py com limpeza segura
 
 # Outros parâmetros
 MAX_RETRIES_DOWNLOAD = 5
+
+# Download HTTP das imagens (sessão compartilhada)
+DOWNLOAD_WORKERS = 8          # downloads simultâneos no total
+DOWNLOAD_PER_HOST = 4         # downloads simultâneos por servidor
+DOWNLOAD_CONNECT_TIMEOUT = 5  # segundos
+DOWNLOAD_READ_TIMEOUT = 30    # segundos
+DOWNLOAD_BACKOFF = 0.5        # espera base entre tentativas (dobra a cada erro)
+
+# Caminho rápido: tenta achar as imagens no HTML antes de abrir o Chrome
+FAST_PATH_ENABLED = True
+FAST_PATH_MIN_IMAGES = 5      # menos que isso (no mesmo servidor + pasta) → usa o Chrome
+
+# Pool de Chromes reaproveitados entre capítulos
+BROWSER_POOL_SIZE = 1         # Chromes abertos ao mesmo tempo
+BROWSER_MAX_PAGES = 400       # páginas baixadas por Chrome antes de reciclar
+
+# Coleta das imagens na página (Selenium)
+HARVEST_QUIET_MS = 500        # página "parada" por esse tempo = carregou
+HARVEST_STEP_TIMEOUT = 5      # espera máxima por passo de rolagem (s)
+HARVEST_TIMEOUT = 120         # limite total da coleta (s)
 OCR_CONF_THRESHOLD = 15
 
+# OCR da página em uma passada: o Tesseract roda uma vez por faixa e as palavras
+# são distribuídas entre os balões e o texto solto (False = OCR por balão + página de novo).
+# Desligado até benchmarks/bench_ocr_single_pass.py rodar em páginas reais: a passada
+# única perde o pré-processamento (threshold) de cada balão
+OCR_SINGLE_PASS = False
+
+# Filtro de tinta antes do OCR: recortes/faixas sem nada com cara de letra
+# (painéis vazios, calhas, céu) não vão para o Tesseract
+OCR_PREFILTER = True
+OCR_PREFILTER_MIN_GLYPHS = 1  # glifos plausíveis necessários para chamar o OCR
+
+# Detecção de balões na página reduzida (0.5 = metade da resolução); as caixas
+# são refinadas na resolução original só em volta de cada candidato (1 = como antes)
+DETECT_SCALE = 0.5
+
+# Limpeza do texto original: uma máscara para a página inteira; manchas sobre fundo
+# claro e liso (balões) são pintadas com a cor do fundo e só as que ficam sobre a
+# arte passam pelo inpaint (False = inpaint recorte por recorte, como antes)
+PAGE_TEXT_CLEANUP = True
+FLAT_FILL_MIN_LEVEL = 200     # brilho médio mínimo do fundo em volta da mancha
+FLAT_FILL_MAX_STD = 12        # variação máxima do fundo (acima disso é arte → inpaint)
+
 # -------------------------------------------------------
 # 🚀 Configurações do tradutor
 # -------------------------------------------------------
@@ -30,5 +94,55 @@ OCR_CONF_THRESHOLD = 15
 # "huggingface" → usar IA de tradução mais natural
 TRANSLATION_MODE = "google"
 
+# Máximo de textos por chamada ao generate() no modo em lote (NLLB)
+TRANSLATION_BATCH_SIZE = 16
+
+# NLLB: dispositivo e inferência na CPU
+NLLB_DEVICE = "auto"          # "auto" (GPU se houver) | "cpu" | "cuda"
+# CPU: int8 dinâmico nas camadas Linear (menos memória, mais rápido). Desligado até
+# benchmarks/bench_nllb_cpu.py rodar com o torch e o modelo de verdade (qualidade × latência)
+NLLB_CPU_QUANTIZE = False
+NLLB_CPU_THREADS = None       # None = núcleos livres (descontando os processos de PAGE_WORKERS)
+NLLB_NUM_BEAMS = 4            # 1 = greedy (mais rápido)
+NLLB_MAX_LENGTH = 256         # limite absoluto de tokens na saída
+NLLB_LENGTH_RATIO = 2.0       # limite por lote: tokens de entrada × razão + folga
+NLLB_LENGTH_EXTRA = 16
+
 # Modelo HuggingFace (caso escolha: TRANSLATION_MODE = "huggingface")
 HF_MODEL = "Helsinki-NLP/opus-mt-mul-pt"
+
+# -------------------------------------------------------
+# ⚡ Modo pipeline (OCR → tradução → desenho em paralelo)
+# -------------------------------------------------------
+
+# Threads de OCR alimentando a fila de tradução
+PIPELINE_OCR_WORKERS = 2
+
+# Processos para OCR / inpainting / desenho (1 = sem pool, tudo no processo principal)
+PAGE_WORKERS = 1
+
+# Tamanho máximo das filas entre etapas (em páginas) — limita o uso de memória
+PIPELINE_QUEUE_SIZE = 4
+
+# Páginas mais altas que isso são analisadas em faixas (detecção + OCR)
+# None = sempre a página inteira
+TILE_HEIGHT = 3000
+TILE_OVERLAP = 300   # sobreposição entre faixas (maior que um balão/linha de texto típico)
+
+# Orçamento de tokens por lote de tradução (somando textos de várias páginas)
+TRANSLATION_TOKEN_BUDGET = 1024
+
+# -------------------------------------------------------
+# 💾 Memória de tradução (cache persistente)
+# -------------------------------------------------------
+TRANSLATION_MEMORY_ENABLED = True
+TRANSLATION_MEMORY_PATH = "translation_memory.sqlite3"
+TRANSLATION_MEMORY_MAX_ENTRIES = 200_000   # acima disso remove as menos usadas
+TRANSLATION_MEMORY_LRU_SIZE = 4096         # entradas mantidas em RAM
+
+# -------------------------------------------------------
+# 🔎 Cache de OCR (texto + caixas por página/recorte)
+# -------------------------------------------------------
+OCR_CACHE_ENABLED = True
+OCR_CACHE_PATH = "ocr_cache.sqlite3"
+OCR_CACHE_MAX_MB = 256                     # acima disso remove os menos usados
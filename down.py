@@ -1,14 +1,17 @@
 import os
 import time
 import base64
-import requests
+import itertools
 import shutil
 import stat
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from config import CHROMEDRIVER_PATH, TEMP_FOLDER
+from config import MAX_RETRIES_DOWNLOAD, FAST_PATH_ENABLED, DOWNLOAD_WORKERS, PIPELINE_QUEUE_SIZE
+from http_fetch import fetch_many
+from page_harvest import harvest_image_candidates
+from page_extractors import fast_extract
+from browser_pool import get_browser_pool
+from workspace import Workspace
+from page_buffer import Page
+from job_manifest import DonePage, page_name
 
 
 # -------------------------------------------------------------
@@ -25,157 +28,268 @@ def force_remove(path):
     shutil.rmtree(path, onerror=remove_readonly)
 
 
-def download_images(url, progress_callback=None, max_retries=3):
-
-    # ---------------------------------------------------------
-    # 🔥 Limpa a pasta TEMP_FOLDER com método seguro
-    # ---------------------------------------------------------
-    if os.path.exists(TEMP_FOLDER):
-        force_remove(TEMP_FOLDER)
-
-    os.makedirs(TEMP_FOLDER, exist_ok=True)
-
-    tmp_files = []
-    failed_candidates = []
+# ---------------------------------------------------------
+# 🧪 Função JS para baixar uma imagem de dentro da página (blob via fetch)
+# arguments[0]: elemento <img> ou URL da imagem
+# ---------------------------------------------------------
+FETCH_BLOB_SCRIPT = """
+    var src = arguments[0].src || arguments[0];
+    var callback = arguments[1];
+    fetch(src)
+        .then(r => r.ok ? r.blob() : Promise.reject(r.status))
+        .then(b => {
+            var reader = new FileReader();
+            reader.onloadend = () =>
+                callback(reader.result.split(',')[1]);
+            reader.readAsDataURL(b);
+        })
+        .catch(() => callback(null));
+"""
+
+
+def download_images(url, progress_callback=None, max_retries=MAX_RETRIES_DOWNLOAD, report=None, workspace=None,
+                    in_memory=False, manifest=None):
+    """Baixa todas as imagens do capítulo e retorna a lista de arquivos (em ordem)."""
+    # Pelo nome da página: a lista mistura caminhos, Page e DonePage ao retomar um job
+    return sorted(iter_download_images(url, progress_callback, max_retries, report, workspace,
+                                       in_memory, manifest), key=page_name)
+
+
+def iter_download_images(url, progress_callback=None, max_retries=MAX_RETRIES_DOWNLOAD, report=None,
+                         workspace=None, in_memory=False, manifest=None):
+    """
+    Mesmo fluxo de download_images, mas como gerador:
+    cada página é entregue assim que termina de baixar (na ordem do capítulo),
+    para que as próximas etapas possam começar antes do download acabar.
+
+    Primeiro tenta o caminho rápido (HTML via HTTP, sem Chrome); o Chrome só é
+    aberto se ele achar menos de FAST_PATH_MIN_IMAGES imagens.
+    Se `report` (dict) for passado, recebe: path ("http:<extrator>" ou "browser"),
+    seconds (tempo para descobrir as URLs) e images.
+
+    workspace: pastas desta execução (padrão: as pastas temporárias globais).
+    in_memory=True → entrega objetos Page com os bytes originais, sem gravar no disco.
+    manifest (JobManifest): páginas já traduzidas em uma execução anterior não são
+    baixadas de novo; saem como DonePage, na posição delas.
+    """
+    report = {} if report is None else report
+    workspace = workspace or Workspace.legacy()
+    folder = workspace.download_dir
 
     # ---------------------------------------------------------
-    # 🔧 Configurações do Chrome (estável)
+    # 🔥 Limpa a pasta de downloads (só a desta execução)
     # ---------------------------------------------------------
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--log-level=3")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option("useAutomationExtension", False)
-
-    if not os.path.isfile(CHROMEDRIVER_PATH):
-        raise FileNotFoundError(f"❌ CHROMEDRIVER_PATH inválido:\n{CHROMEDRIVER_PATH}")
-
-    driver = webdriver.Chrome(
-        service=Service(CHROMEDRIVER_PATH),
-        options=chrome_options
-    )
+    if os.path.exists(folder):
+        force_remove(folder)
 
-    # ---------------------------------------------------------
-    # 🌐 Carrega a página
-    # ---------------------------------------------------------
-    driver.get(url)
-    time.sleep(3)
+    os.makedirs(folder, exist_ok=True)
 
     # ---------------------------------------------------------
-    # 📜 Scroll infinito
+    # ⚡ Caminho rápido: HTML estático / JSON embutido
     # ---------------------------------------------------------
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    while True:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1.5)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
+    if FAST_PATH_ENABLED:
+        urls, extractor, elapsed = fast_extract(url)
+        if urls:
+            report.update(path=f"http:{extractor}", seconds=elapsed, images=len(urls))
+            print(f"⚡ Caminho rápido ({extractor}): {len(urls)} imagens em {elapsed:.1f}s, sem abrir o Chrome")
+            yield from _download_direct(urls, url, folder, progress_callback, max_retries, in_memory, manifest)
+            return
+        print(f"🐢 Caminho rápido não achou imagens suficientes ({elapsed:.1f}s), abrindo o Chrome")
 
     # ---------------------------------------------------------
-    # 🎯 Coleta imagens
+    # 🌐 Chrome emprestado do pool (fica aberto entre capítulos)
+    # Coleta + downloads + fallback pelo navegador rodam com o driver emprestado;
+    # as páginas só são entregues depois da devolução, para o Chrome não ficar
+    # preso durante o OCR/tradução do capítulo. Os bytes ficam no disco até lá
+    # (em memória, cada página é lida só quando for entregue).
     # ---------------------------------------------------------
-    imgs = driver.find_elements(By.TAG_NAME, "img")
-    candidates = []
-
-    for img in imgs:
-        try:
-            w = img.size.get("width", 0)
-            h = img.size.get("height", 0)
-            y = img.location.get("y", 0)
-
-            # Pega src ou data-src
-            src = (
-                img.get_attribute("src")
-                or img.get_attribute("data-src")
-                or img.get_attribute("data-lazy-src")
-                or ""
-            )
-
-            if w >= 200 and h >= 200:
-                candidates.append({"el": img, "src": src, "y": y})
+    pool = get_browser_pool()
+    with pool.borrow() as driver:
+        pages = list(_download_with_driver(driver, url, folder, progress_callback, max_retries, report,
+                                           manifest=manifest))
+        pool.add_pages(driver, len(pages))
+
+    for page in pages:
+        if in_memory and isinstance(page, str):
+            yield Page.from_file(page)
+        else:
+            yield page
 
-        except:
-            pass
 
-    candidates = sorted(candidates, key=lambda x: x["y"])
+def _download_with_driver(driver, url, folder, progress_callback, max_retries, report, in_memory=False,
+                          manifest=None):
+    failed_candidates = []
 
     # ---------------------------------------------------------
-    # 🧪 Função JS para blob via fetch()
+    # 🌐 Carrega a página, rola e coleta as imagens
+    # (espera por eventos de carregamento em vez de sleeps fixos)
     # ---------------------------------------------------------
-    fetch_blob_script = """
-        var img = arguments[0];
-        var callback = arguments[1];
-        fetch(img.src)
-            .then(r => r.blob())
-            .then(b => {
-                var reader = new FileReader();
-                reader.onloadend = () =>
-                    callback(reader.result.split(',')[1]);
-                reader.readAsDataURL(b);
-            })
-            .catch(() => callback(null));
-    """
+    start = time.time()
+    candidates = harvest_image_candidates(driver, url)
+    report.update(path="browser", seconds=time.time() - start, images=len(candidates))
 
     def save_bytes(data, path):
-        with open(path, "wb") as f:
-            f.write(data)
+        return _save_bytes(data, path, in_memory)
 
     # ---------------------------------------------------------
-    # 📥 Função de download com retry
+    # 🧭 Fallback pelo navegador (só para o que o HTTP não conseguiu)
     # ---------------------------------------------------------
-    def try_save(el, src, path):
-
-        # 1) Tenta baixar direto via HTTP
-        if src.startswith("http"):
-            for attempt in range(max_retries):
-                try:
-                    r = requests.get(src, timeout=10, headers={
-                        "User-Agent": "Mozilla/5.0"
-                    })
-                    if r.status_code == 200:
-                        save_bytes(r.content, path)
-                        return True
-                except:
-                    pass
-
-        # 2) Blob via navegador
+    def save_with_browser(el, path):
+
+        # 1) Blob via navegador
         try:
-            b64 = driver.execute_async_script(fetch_blob_script, el)
+            b64 = driver.execute_async_script(FETCH_BLOB_SCRIPT, el)
             if b64:
-                save_bytes(base64.b64decode(b64), path)
-                return True
+                return save_bytes(base64.b64decode(b64), path)
         except:
             pass
 
-        # 3) Screenshot
+        # 2) Screenshot
         try:
-            el.screenshot(path)
-            return True
+            return save_bytes(el.screenshot_as_png, path)
         except:
             pass
 
         return False
 
     # ---------------------------------------------------------
-    # 📥 Baixa as imagens
+    # 📥 Baixa as imagens (HTTP em paralelo, sessão compartilhada)
     # ---------------------------------------------------------
-    for i, c in enumerate(candidates, start=1):
-        file_path = os.path.join(TEMP_FOLDER, f"{i:03}.png")
+    paths = {i: os.path.join(folder, f"{i:03}.png") for i in range(1, len(candidates) + 1)}
+    done = _done_pages(manifest, paths, [c["src"] for c in candidates])
+    jobs = [
+        (i, c["src"], None if in_memory else paths[i])
+        for i, c in enumerate(candidates, start=1)
+        if c["src"].startswith("http") and i not in done
+    ]
+    # Sem URL http (blob:, data:...) → direto para o navegador
+    no_http = [
+        (i, False) for i, c in enumerate(candidates, start=1)
+        if not c["src"].startswith("http") and i not in done
+    ]
+
+    results = itertools.chain(
+        done.items(),
+        no_http,
+        fetch_many(jobs, max_retries=max_retries, headers={"Referer": url}, window=_memory_window(in_memory))
+    )
+
+    def fallback(i):
+        # O driver só é usado nesta thread (Selenium não é thread-safe)
+        ok = save_with_browser(candidates[i - 1]["el"], paths[i])
+        if not ok:
+            failed_candidates.append((i, candidates[i - 1]))
+        return ok
 
-        ok = try_save(c["el"], c["src"], file_path)
+    yield from _in_order(results, paths, fallback, progress_callback, manifest)
 
-        if ok:
-            tmp_files.append(file_path)
+
+def _save_bytes(data, path, in_memory):
+    if in_memory:
+        return data
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def _download_direct(urls, url, folder, progress_callback, max_retries, in_memory=False, manifest=None):
+    """
+    Caminho rápido: HTTP sem navegador. Página que o HTTP não consegue baixar
+    (ex.: 403 de proteção contra hotlink) é baixada pelo Chrome, de dentro da
+    página do capítulo (cookies e Referer do site).
+    """
+    paths = {i: os.path.join(folder, f"{i:03}.png") for i in range(1, len(urls) + 1)}
+    done = _done_pages(manifest, paths, urls)
+    jobs = [(i, src, None if in_memory else paths[i]) for i, src in enumerate(urls, start=1) if i not in done]
+    results = itertools.chain(
+        done.items(),
+        fetch_many(jobs, max_retries=max_retries, headers={"Referer": url}, window=_memory_window(in_memory))
+    )
+
+    def fallback(i):
+        print(f"🌐 Página {i} falhou por HTTP, tentando pelo Chrome")
+        data = _browser_fetch(url, urls[i - 1])
+        return _save_bytes(data, paths[i], in_memory) if data else False
+
+    yield from _in_order(results, paths, fallback, progress_callback, manifest)
+
+
+def _browser_fetch(url, src):
+    """
+    Baixa a imagem `src` pelo Chrome, a partir da página do capítulo `url`.
+    O driver é emprestado só durante esta chamada (nunca entre páginas entregues).
+    Retorna os bytes ou None.
+    """
+    try:
+        pool = get_browser_pool()
+        with pool.borrow() as driver:
+            driver.get(url)
+            b64 = driver.execute_async_script(FETCH_BLOB_SCRIPT, src)
+            pool.add_pages(driver, 1)
+        return base64.b64decode(b64) if b64 else None
+    except Exception as e:
+        print(f"⚠️ Chrome também não conseguiu baixar {src}: {e}")
+        return None
+
+
+def _memory_window(in_memory):
+    """
+    Páginas em memória: baixa no máximo uma fila do pipeline + um lote de
+    downloads à frente da página que está sendo consumida (o resto espera).
+    No disco não há limite: os bytes não ficam na RAM.
+    """
+    return PIPELINE_QUEUE_SIZE + DOWNLOAD_WORKERS if in_memory else None
+
+
+def _done_pages(manifest, paths, urls):
+    """Registra as URLs no manifesto e retorna {i: DonePage} das páginas já prontas."""
+    if manifest is None:
+        return {}
+
+    names = {i: os.path.basename(p) for i, p in paths.items()}
+    manifest.sync_sources({names[i]: src for i, src in enumerate(urls, start=1)})
+
+    done = {}
+    for i, name in names.items():
+        page = manifest.done_page(name)
+        if page:
+            done[i] = page
+    if done:
+        print(f"♻️ {len(done)}/{len(paths)} páginas já traduzidas em uma execução anterior")
+    return done
+
+
+def _in_order(results, paths, fallback, progress_callback, manifest=None):
+    """
+    Os downloads terminam fora de ordem; as páginas saem na ordem do capítulo.
+    fallback(i) é chamado para cada página que o HTTP não conseguiu baixar.
+    Resultado em bytes (download em memória) vira um Page com o caminho da página;
+    DonePage (página pronta de uma execução anterior) passa direto.
+    """
+    ready = {}
+    next_i = 1
+    done = 0
+
+    for i, ok in results:
+        if not ok and fallback:
+            ok = fallback(i)
+
+        if isinstance(ok, bytes):
+            ready[i] = Page(paths[i], ok)
+        elif isinstance(ok, DonePage):
+            ready[i] = ok
         else:
-            failed_candidates.append((i, c))
+            ready[i] = paths[i] if ok else None
+
+        if ready[i] is None and manifest is not None:
+            manifest.record_download_failure(os.path.basename(paths[i]))
+        done += 1
 
         if progress_callback:
-            progress_callback(i, len(candidates), "Baixando imagens")
+            progress_callback(done, len(paths), "Baixando imagens")
 
-    driver.quit()
-    return sorted(tmp_files)
+        while next_i in ready:
+            path = ready.pop(next_i)
+            next_i += 1
+            if path:
+                yield path
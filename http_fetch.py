@@ -0,0 +1,184 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# Erros 4xx que não adianta repetir (o navegador ainda pode conseguir, ex.: hotlink)
+_NO_RETRY = {400, 401, 403, 404, 410}
+
+
+# -------------------------------------------------------------
+# 🔌 Sessão HTTP compartilhada (conexões reaproveitadas)
+# -------------------------------------------------------------
+def build_session(pool_size=None):
+    pool_size = pool_size or config.DOWNLOAD_WORKERS
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+class HostLimiter:
+    """Limita quantos downloads simultâneos cada host recebe."""
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._sems = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            sem = self._sems.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with sem:
+            yield
+
+
+# -------------------------------------------------------------
+# 📥 Download de um arquivo com retry + backoff exponencial
+# -------------------------------------------------------------
+BACKOFF_MAX = 30.0  # maior espera entre tentativas (s)
+
+
+def _backoff(attempt, base, retry_after=None):
+    if retry_after is not None:
+        # Retry-After vem do servidor: "3600" não pode travar o worker por uma hora
+        return max(0.0, min(BACKOFF_MAX, retry_after))
+    # Exponencial com jitter, limitado a BACKOFF_MAX
+    return min(BACKOFF_MAX, base * (2 ** attempt) * random.uniform(0.8, 1.2))
+
+
+def _fetch(url, consume, cleanup=None, session=None, limiter=None, max_retries=None,
+           timeout=None, backoff=None, headers=None):
+    """
+    Laço de retry comum: consume(resposta 200) devolve o resultado;
+    cleanup() desfaz uma tentativa que falhou no meio.
+    Retorna o resultado ou None.
+    """
+    session = session or get_session()
+    limiter = limiter or HostLimiter(config.DOWNLOAD_PER_HOST)
+    max_retries = max_retries or config.MAX_RETRIES_DOWNLOAD
+    timeout = timeout or (config.DOWNLOAD_CONNECT_TIMEOUT, config.DOWNLOAD_READ_TIMEOUT)
+    backoff = config.DOWNLOAD_BACKOFF if backoff is None else backoff
+
+    for attempt in range(max_retries):
+        retry_after = None
+        try:
+            with limiter.slot(url):
+                with session.get(url, stream=True, timeout=timeout, headers=headers) as r:
+                    if r.status_code == 200:
+                        return consume(r)
+
+                    if r.status_code in _NO_RETRY:
+                        return None
+
+                    if r.status_code == 429:
+                        try:
+                            retry_after = float(r.headers.get("Retry-After", ""))
+                        except ValueError:
+                            retry_after = None
+        except (requests.RequestException, OSError):
+            pass
+
+        if cleanup:
+            cleanup()
+
+        if attempt < max_retries - 1:
+            time.sleep(_backoff(attempt, backoff, retry_after))
+
+    return None
+
+
+def fetch_to_file(url, path, **kwargs):
+    """
+    Baixa `url` em `path` gravando em blocos (sem carregar tudo na memória).
+    Grava em `path.part` e só renomeia no fim → nunca deixa arquivo pela metade.
+    Retorna True/False.
+    """
+    tmp_path = path + ".part"
+
+    def consume(r):
+        with open(tmp_path, "wb") as f:
+            for chunk in r.iter_content(64 * 1024):
+                if chunk:
+                    f.write(chunk)
+        os.replace(tmp_path, path)
+        return True
+
+    def cleanup():
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return bool(_fetch(url, consume, cleanup, **kwargs))
+
+
+def fetch_bytes(url, **kwargs):
+    """Baixa `url` direto para a memória. Retorna os bytes ou None."""
+    return _fetch(url, lambda r: b"".join(r.iter_content(64 * 1024)), **kwargs)
+
+
+def fetch_many(jobs, session=None, workers=None, per_host=None, window=None, **kwargs):
+    """
+    Baixa vários arquivos em paralelo.
+    jobs: lista de (chave, url, caminho)
+    Gera (chave, ok) na ordem em que os downloads terminam.
+    Com caminho None a imagem fica na memória: gera (chave, bytes ou None).
+
+    window: um job só começa se estiver a menos de `window` posições do job mais
+    antigo ainda não entregue (None = todos de uma vez). Com downloads em
+    memória, limita quantas imagens ficam na RAM esperando quem consome,
+    inclusive as que chegaram fora de ordem.
+    """
+    if not jobs:
+        return
+
+    session = session or get_session()
+    limiter = HostLimiter(per_host or config.DOWNLOAD_PER_HOST)
+    workers = workers or config.DOWNLOAD_WORKERS
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        queued = deque(enumerate(jobs))
+        futs = {}  # future → (posição, chave)
+
+        while queued or futs:
+            oldest = min((pos for pos, _ in futs.values()), default=queued[0][0] if queued else 0)
+            while queued and (window is None or queued[0][0] < oldest + window):
+                pos, (key, url, path) = queued.popleft()
+                fut = (pool.submit(fetch_to_file, url, path, session=session, limiter=limiter, **kwargs) if path
+                       else pool.submit(fetch_bytes, url, session=session, limiter=limiter, **kwargs))
+                futs[fut] = (pos, key)
+
+            finished, _ = wait(futs, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                _, key = futs.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception:
+                    result = None
+                yield key, result
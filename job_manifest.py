@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import config
+from page_buffer import Page
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+PENDING, DONE, PARTIAL, FAILED = "pending", "done", "partial", "failed"
+
+
+def sha1_bytes(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def sha1_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def page_name(item):
+    """Nome da página (chave no manifesto): 001.png, 002.png..."""
+    return os.path.basename(item.path if hasattr(item, "path") else item)
+
+
+def job_folder_for(source, lang_choice, engine, root=None):
+    """Mesma fonte + idioma + motor → mesmo job (é o que permite retomar)."""
+    key = sha1_bytes(f"{os.path.abspath(source) if os.path.isdir(source) else source}|"
+                     f"{lang_choice}|{engine}".encode())[:16]
+    return os.path.join(root or config.JOBS_FOLDER, key)
+
+
+class DonePage:
+    """Página já traduzida em uma execução anterior: a saída está no diretório do job."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return f"DonePage({os.path.basename(self.path)!r})"
+
+    def __lt__(self, other):
+        return page_name(self) < page_name(other)
+
+    def pdf_source(self):
+        return self.path
+
+
+class JobManifest:
+    """
+    Manifesto de um capítulo, uma entrada por página:
+
+        url_hash      → hash da URL (ou do arquivo local) de onde a página veio
+        download      → "ok" | "failed"
+        source_hash   → hash dos bytes baixados
+        regions       → resultado do OCR (caixas + textos)
+        translations  → traduções, na ordem de regions
+        output        → página pronta salva no job (só quando já existe codificada:
+                        arquivo do pool ou bytes originais); output_hash confere o arquivo
+        status        → "pending" | "done" | "partial" (algum texto ficou sem tradução) | "failed"
+        partial_runs  → execuções seguidas em que a página terminou "partial"
+
+    Ao rodar de novo o mesmo capítulo, páginas "done" com output não são baixadas
+    nem processadas; as outras reaproveitam o que já deu certo (OCR, traduções) e
+    só são baixadas e redesenhadas.
+    Gravado em JSON quando uma página termina (pronta ou com falha) e no fim da
+    execução (flush); as etapas do meio só mudam a memória. Escrita atômica:
+    .tmp + os.replace.
+    """
+
+    def __init__(self, folder, source=None, lang_choice=None, engine=None):
+        self.folder = folder
+        self.out_dir = os.path.join(folder, "out")
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._dirty = False
+
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        meta = {"source": source, "lang": str(lang_choice), "engine": engine}
+        self.data = self._load(meta)
+        self.resumed = bool(self.data["pages"])
+
+    def _load(self, meta):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION and data.get("meta") == meta:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {"version": MANIFEST_VERSION, "meta": meta, "pages": {}}
+
+    @classmethod
+    def for_chapter(cls, source, lang_choice, engine, root=None):
+        return cls(job_folder_for(source, lang_choice, engine, root), source, lang_choice, engine)
+
+    # ------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------
+    def save(self):
+        with self._lock:
+            self.data["updated"] = time.time()
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    def flush(self):
+        """Grava o que mudou desde o último save (chamado no fim da execução)."""
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+    def remove(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def _entry(self, name):
+        return self.data["pages"].setdefault(name, {"status": PENDING})
+
+    def _update(self, name, save=False, **fields):
+        """save=True: a página terminou (grava agora); senão fica para o próximo save/flush."""
+        with self._lock:
+            self._entry(name).update(fields)
+            if save:
+                self.save()
+            else:
+                self._dirty = True
+
+    # ------------------------------------------------------------
+    # Download
+    # ------------------------------------------------------------
+    def sync_sources(self, sources):
+        """
+        sources: {nome_da_página: url} da execução atual.
+        Páginas cuja URL mudou voltam do zero; páginas que sumiram saem do manifesto.
+        """
+        with self._lock:
+            pages = self.data["pages"]
+            for name in list(pages):
+                if name not in sources:
+                    del pages[name]
+            for name, url in sources.items():
+                url_hash = sha1_bytes(url.encode())
+                entry = pages.get(name)
+                if entry is None or entry.get("url_hash") != url_hash:
+                    pages[name] = {"status": PENDING, "url_hash": url_hash}
+            self.save()
+
+    def done_page(self, name):
+        """DonePage se a página já está pronta (e a saída confere com o hash), senão None."""
+        with self._lock:
+            entry = self.data["pages"].get(name)
+            if not entry or entry.get("status") != DONE:
+                return None
+            output = entry.get("output")
+        if not output:
+            # Página desenhada em memória: só OCR + traduções ficaram no job
+            return None
+
+        path = os.path.join(self.folder, output)
+        if os.path.exists(path) and sha1_file(path) == entry.get("output_hash"):
+            return DonePage(path)
+
+        # Saída apagada ou corrompida → desenha de novo (OCR e traduções continuam valendo)
+        self._update(name, status=PENDING, output=None, output_hash=None)
+        return None
+
+    def record_download_failure(self, name):
+        self._update(name, save=True, download=FAILED, status=FAILED)
+
+    def record_source(self, name, item):
+        """
+        Confere os bytes da página baixada. Se mudaram desde a última execução,
+        o OCR e as traduções guardados deixam de valer.
+        """
+        if isinstance(item, Page):
+            source_hash = sha1_bytes(item.data)
+        else:
+            source_hash = sha1_file(item)
+
+        with self._lock:
+            entry = self._entry(name)
+            if entry.get("source_hash") != source_hash:
+                for key in ("regions", "translations", "output", "output_hash"):
+                    entry.pop(key, None)
+            entry.update(download="ok", source_hash=source_hash)
+            self._dirty = True
+
+    # ------------------------------------------------------------
+    # OCR / tradução
+    # ------------------------------------------------------------
+    def cached_regions(self, name):
+        with self._lock:
+            return self.data["pages"].get(name, {}).get("regions")
+
+    def record_regions(self, name, regions):
+        self._update(name, regions=[dict(r, box=[int(v) for v in r["box"]]) for r in regions])
+
+    def cached_translations(self, name):
+        with self._lock:
+            entry = self.data["pages"].get(name, {})
+            # Página "partial": algum texto voltou igual ao original (ex.: limite do Google);
+            # refaz a tradução até JOBS_PARTIAL_RETRIES vezes (ver store_output)
+            if entry.get("status") == PARTIAL:
+                return None
+            return entry.get("translations")
+
+    def record_translations(self, name, texts, translations):
+        untranslated = sum(
+            1 for src, dst in zip(texts, translations)
+            if src.strip() == (dst or "").strip() and any(ch.isalpha() for ch in src)
+        )
+        self._update(name, translations=list(translations), untranslated=untranslated)
+
+    # ------------------------------------------------------------
+    # Saída
+    # ------------------------------------------------------------
+    def store_output(self, name, out):
+        """
+        Guarda a página traduzida no job (para refazer o PDF sem reprocessar)
+        e marca a página como pronta. out: caminho ou Page.
+
+        Page desenhado em memória não é codificado só para o job (seria um PNG +
+        hash por página no caminho padrão): fica sem output, e uma próxima
+        execução baixa e redesenha a página com o OCR e as traduções guardados.
+        """
+        path = os.path.join(self.out_dir, name)
+
+        if isinstance(out, Page):
+            if out.rendered is None:
+                with open(path, "wb") as f:
+                    f.write(out.data)
+                output_hash = sha1_bytes(out.data)
+            else:
+                path = output_hash = None
+        else:
+            if os.path.abspath(out) != os.path.abspath(path):
+                shutil.copyfile(out, path)
+            output_hash = sha1_file(path)
+
+        with self._lock:
+            entry = self._entry(name)
+            untranslated = entry.get("untranslated", 0)
+            runs = entry.get("partial_runs", 0) + 1 if untranslated else 0
+        # Texto que volta igual de novo costuma não ter tradução (nome, "OK", onomatopeia):
+        # depois de JOBS_PARTIAL_RETRIES tentativas a página fica pronta assim mesmo
+        partial = untranslated and runs <= config.JOBS_PARTIAL_RETRIES
+        self._update(
+            name,
+            save=True,
+            output=os.path.relpath(path, self.folder) if path else None,
+            output_hash=output_hash,
+            partial_runs=runs,
+            status=PARTIAL if partial else DONE,
+        )
+        return path
+
+    def record_failure(self, name, error):
+        self._update(name, save=True, status=FAILED, error=str(error))
+
+    # ------------------------------------------------------------
+    # Resumo
+    # ------------------------------------------------------------
+    def counts(self):
+        with self._lock:
+            counts = {}
+            for entry in self.data["pages"].values():
+                counts[entry.get("status", PENDING)] = counts.get(entry.get("status", PENDING), 0) + 1
+            return counts
+
+    @property
+    def complete(self):
+        with self._lock:
+            pages = self.data["pages"].values()
+            return bool(pages) and all(e.get("status") == DONE for e in pages)
@@ -1,14 +1,9 @@
 import os
 import tkinter as tk
 from tkinter import simpledialog, messagebox
-import config  # <--- Importante: Importamos o módulo config para alterar a variável global
 
 from config import FONT_PATH
-from manga_translation_pipeline import (
-    download_chapter_images,
-    translate_chapter_images,
-    export_pdf
-)
+from manga_translation_pipeline import translate_chapter
 from progress import ProgressWindow
 
 
@@ -48,60 +43,37 @@ def main():
         "2 = IA Local (Melhor Qualidade / Offline / Lento)"
     )
 
-    # Configura dinamicamente o modo de tradução
+    # Motor de tradução escolhido
     if mode_choice == "2":
-        config.TRANSLATION_MODE = "huggingface"
+        engine = "huggingface"
     else:
-        config.TRANSLATION_MODE = "google"  # Padrão se cancelar ou escolher 1
+        engine = "google"  # Padrão se cancelar ou escolher 1
 
     # ==============================
-    #       PROGRESSO 1
-    #     BAIXANDO IMAGENS
+    #   DOWNLOAD → TRADUÇÃO → PDF
+    #  (páginas fluem entre etapas)
     # ==============================
-    prog1 = ProgressWindow("Baixando páginas")
+    prog = ProgressWindow("Traduzindo capítulo")
 
-    saved_images = download_chapter_images(
-        url,
-        callback=lambda cur, tot: prog1.update(cur, tot, "Baixando páginas")
-    )
-
-    prog1.close()
-
-    if not saved_images:
-        messagebox.showerror("Erro", "Nenhuma imagem encontrada!")
-        return
-
-    # ==============================
-    #       PROGRESSO 2
-    #     TRADUZINDO PÁGINAS
-    # ==============================
-    prog2 = ProgressWindow("Traduzindo páginas")
+    stage_names = {"download": "Baixando", "traducao": "Traduzindo", "pdf": "Gerando PDF"}
 
-    # Passamos o font_path e o callback de progresso
-    translated_images = translate_chapter_images(
-        saved_images,
+    pdf_path = translate_chapter(
+        url,
         lang_choice,
-        FONT_PATH,
-        callback=lambda cur, tot: prog2.update(cur, tot, "Traduzindo...")
+        output_folder,
+        chapter_name,
+        engine=engine,
+        font_path=FONT_PATH,
+        callback=lambda stage, cur, tot: prog.update(cur, tot, f"{stage_names[stage]}: página {cur} de {tot}")
     )
 
-    prog2.close()
+    prog.update(1, 1, "Concluindo...")
+    prog.close()
 
-    if not translated_images:
-        messagebox.showerror("Erro", "Falha ao traduzir imagens!")
+    if not pdf_path:
+        messagebox.showerror("Erro", "Nenhuma página foi traduzida!")
         return
 
-    # ==============================
-    #       PROGRESSO 3
-    #        GERANDO PDF
-    # ==============================
-    prog3 = ProgressWindow("Gerando PDF")
-
-    pdf_path = export_pdf(translated_images, output_folder, chapter_name)
-
-    prog3.update(1, 1, "Concluindo...")
-    prog3.close()
-
     messagebox.showinfo("Concluído", f"PDF gerado com sucesso:\n{pdf_path}")
 
 
@@ -2,76 +2,824 @@
 
 import os
 import glob
+import shutil
 import time
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
-from down import download_images
-from ocr_balloon import process_image_file
+from down import iter_download_images
+from ocr_balloon import (
+    load_page_image,
+    ocr_page_regions,
+    page_gray,
+    translate_texts,
+    render_page_regions,
+    save_page_output,
+    ocr_page_task,
+    render_page_task,
+    merge_task_stats,
+    ocr_version,
+    OCR_STATS,
+)
 from translator_nllb import get_translator
-from pdf import generate_pdf
+from pdf import generate_pdf, StreamingPdfWriter
+from workspace import Workspace
+from page_buffer import IO_STATS, Page
+from job_manifest import JobManifest, DonePage, page_name
+from ocr_cache import get_ocr_cache
 
-from config import TEMP_FOLDER, TEMP_OUT, FONT_PATH
+from config import (
+    FONT_PATH,
+    PIPELINE_OCR_WORKERS,
+    PAGE_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+    TRANSLATION_TOKEN_BUDGET,
+    PAGES_IN_MEMORY,
+    RESUMABLE_JOBS,
+    JOBS_KEEP_DONE,
+    TRANSLATION_MODE,
+)
 
 
 # ======================================================
 # 1) Baixar imagens do capítulo
 # ======================================================
-def download_chapter_images(url, callback=None):
+def download_chapter_images(url, callback=None, report=None, workspace=None, in_memory=False, manifest=None):
     """
-    Baixa todas as imagens do capítulo usando down.py e as salva em TEMP_FOLDER.
+    Baixa todas as imagens do capítulo usando down.py e as salva na pasta de
+    downloads do workspace (padrão: TEMP_FOLDER).
+    report (dict opcional) recebe qual caminho foi usado (HTTP rápido ou Chrome) e o tempo.
+    in_memory=True → retorna objetos Page (bytes originais), sem gravar no disco.
+    manifest: páginas prontas de uma execução anterior voltam como DonePage (sem baixar).
     """
-    if os.path.exists(TEMP_FOLDER):
-        for f in glob.glob(TEMP_FOLDER + "/*"):
-            os.remove(f)
+    # Pelo nome da página: a lista mistura caminhos, Page e DonePage ao retomar um job
+    return sorted(iter_chapter_images(url, callback, report, workspace, in_memory, manifest), key=page_name)
 
-    imgs = download_images(url, progress_callback=lambda v, m, t: callback(v, m) if callback else None)
-    return imgs
+
+def iter_chapter_images(url, callback=None, report=None, workspace=None, in_memory=False, manifest=None):
+    """Versão em gerador: entrega cada página assim que ela é baixada."""
+    workspace = workspace or Workspace.legacy()
+    for f in glob.glob(os.path.join(workspace.download_dir, "*")):
+        os.remove(f)
+
+    yield from iter_download_images(
+        url,
+        progress_callback=lambda v, m, t: callback(v, m) if callback else None,
+        report=report,
+        workspace=workspace,
+        in_memory=in_memory,
+        manifest=manifest
+    )
+
+
+def iter_folder_images(folder, workspace, in_memory=False, callback=None, manifest=None):
+    """
+    Páginas de uma pasta local, em ordem de nome.
+    Em memória: lê só os bytes (sem copiar nem decodificar).
+    Em disco: copia para o workspace (a saída é derivada do caminho de entrada,
+    então a pasta original nunca é sobrescrita).
+    manifest: páginas prontas de uma execução anterior voltam como DonePage.
+    """
+    originals = list_folder_images(folder)
+    if manifest is not None:
+        manifest.sync_sources({os.path.basename(p): os.path.abspath(p) for p in originals})
+
+    for idx, path in enumerate(originals, start=1):
+        dst = os.path.join(workspace.download_dir, os.path.basename(path))
+        done = manifest.done_page(os.path.basename(path)) if manifest is not None else None
+        if done:
+            yield done
+        elif in_memory:
+            yield Page.from_file(path, name=dst)
+        else:
+            shutil.copyfile(path, dst)
+            yield dst
+        if callback:
+            callback(idx, len(originals))
 
 
 # ======================================================
 # 2) Traduzir todas as imagens do capítulo
 # ======================================================
-def translate_chapter_images(image_list, lang_choice, font_path, callback=None):
+def translate_chapter_images(image_list, lang_choice, font_path, callback=None, workers=None, engine=None, workspace=None, manifest=None, model_slot=None):
     """
     Processa cada imagem:
-        - OCR
-        - Tradução com NLLB
+        - OCR de todos os textos da página
+        - Tradução em lotes que atravessam páginas (orçamento de tokens)
         - Redesenha texto no balão
-    Salva o resultado em TEMP_OUT
+    Salva o resultado na pasta de saída do workspace (padrão: TEMP_OUT)
+
+    OCR, tradução e desenho rodam em paralelo (ver iter_translated_pages).
+
+    workers=N (N > 1) → OCR e desenho das páginas em um pool de N processos;
+    a tradução continua no processo principal (ver _translate_process_pool).
+
+    engine: "google" ou "huggingface" (padrão: config.TRANSLATION_MODE)
+
+    image_list pode ter objetos Page (páginas em memória), exceto com workers > 1:
+    os processos do pool leem as páginas do disco.
+
+    manifest (JobManifest): registra cada página e reaproveita o que já foi
+    feito em execuções anteriores.
+
+    model_slot: ver get_translator.
     """
-    translator, ocr_lang = get_translator(lang_choice)
-    translate_fn = translator.translate
+    workers = PAGE_WORKERS if workers is None else workers
+
+    workspace = workspace or Workspace.legacy()
+    io_before = IO_STATS.snapshot()
+    ocr_before = OCR_STATS.snapshot()
 
-    if not os.path.exists(TEMP_OUT):
-        os.makedirs(TEMP_OUT)
+    translator, ocr_lang = get_translator(lang_choice, engine, workers, model_slot)
+
+    os.makedirs(workspace.output_dir, exist_ok=True)
+
+    if workers and workers > 1:
+        out_files = _translate_process_pool(image_list, translator, ocr_lang, font_path, callback, workers,
+                                            workspace, manifest)
+        _print_memory_stats(translator)
+        _print_io_stats(io_before, ocr_before)
+        return out_files
 
     out_files = []
     total = len(image_list)
 
-    for idx, img_path in enumerate(image_list, start=1):
-        out = process_image_file(
-            img_path,
-            ocr_lang,
-            translate_fn,
-            font_path=font_path,
-            save_out=True
-        )
-
+    pages = iter_translated_pages(image_list, translator, ocr_lang, font_path, workspace, manifest)
+    for idx, out in enumerate(pages, start=1):
         if out:
             out_files.append(out)
 
         if callback:
             callback(idx, total)
 
+    _print_memory_stats(translator)
+    _print_io_stats(io_before, ocr_before)
     return out_files
 
 
+def _print_memory_stats(translator):
+    loaded = getattr(translator, "loaded", None)
+    if loaded is not None:
+        print(f"🧠 Modelo: {loaded.describe()}")
+
+    memory = getattr(translator, "memory", None)
+    if memory is None:
+        return
+    st = memory.stats()
+    print(f"💾 Memória de tradução: {st['hits']} acertos / {st['misses']} faltas "
+          f"({st['hit_rate']:.0%}) • {st['entries']} entradas")
+
+
+def _print_io_stats(before, ocr_before=None):
+    print(f"🖼️ Codificação/decodificação de imagens: {IO_STATS.format(IO_STATS.since(before))}")
+
+    if ocr_before is not None:
+        ocr = OCR_STATS.since(ocr_before)
+        calls = sum(count for (stage, _), (count, _) in ocr.items() if stage == "tesseract")
+        seconds = sum(sec for (stage, _), (_, sec) in ocr.items() if stage == "tesseract")
+        skipped = ocr.get(("prefilter", "skip"), (0, 0.0))[0]
+        print(f"🔤 OCR: {calls} chamadas ao Tesseract ({seconds:.1f}s) • "
+              f"{skipped} evitadas pelo filtro de tinta")
+
+    cache = get_ocr_cache(ocr_version())
+    if cache is not None and cache.hits + cache.misses:
+        st = cache.stats()
+        print(f"🔎 Cache de OCR: {st['hits']} acertos / {st['misses']} faltas ({st['hit_rate']:.0%}) "
+              f"• {st['bytes'] / 1e6:.1f} MB")
+
+
+# ======================================================
+# 2b) Pipeline: OCR → fila → tradução → fila → desenho
+# ======================================================
+def iter_translated_pages(image_iter, translator, ocr_lang, font_path, workspace=None, manifest=None):
+    """
+    Traduz as páginas conforme chegam de image_iter, em etapas ligadas por
+    filas limitadas (backpressure):
+
+        [threads de OCR] --ocr_q--> [thread do modelo] --render_q--> [desenho (quem consome)]
+
+    - As threads de OCR (PIPELINE_OCR_WORKERS) leem a página e extraem os textos.
+    - Uma única thread do modelo junta textos de várias páginas até o
+      orçamento de tokens (TRANSLATION_TOKEN_BUDGET) e traduz tudo em um lote.
+    - O desenho roda na thread de quem consome, que recebe as páginas na ordem
+      de image_iter.
+
+    No máximo 3 * PIPELINE_QUEUE_SIZE páginas ficam em andamento ao mesmo tempo:
+    a memória não cresce com o tamanho do capítulo, nem quando uma página lenta
+    segura as seguintes.
+
+    Entrega o caminho da página traduzida, o próprio Page se a página estava
+    em memória, ou None se a imagem não abriu. DonePage (já pronta) passa direto.
+    Erro no OCR/desenho: a página original entra sem tradução (o PDF não
+    perde páginas) e fica como falha no job, para a próxima execução refazer.
+
+    manifest (JobManifest): reaproveita OCR e traduções de execuções anteriores
+    e registra cada etapa (como ocr_balloon.process_image_file).
+    """
+    count_tokens = _token_counter(translator)
+    n_ocr = max(1, PIPELINE_OCR_WORKERS)
+
+    page_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    ocr_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    render_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    in_flight = threading.Semaphore(3 * PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    end = object()
+    errors = []
+
+    # Filas que não prendem as threads se quem consome desistir no meio
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return end
+
+    # ---------------- Etapa 0: páginas que chegam ----------------
+    def feeder():
+        try:
+            for idx, item in enumerate(image_iter):
+                while not in_flight.acquire(timeout=0.5):
+                    if stop.is_set():
+                        return
+                if not put(page_q, (idx, item)):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            for _ in range(n_ocr):
+                put(page_q, end)
+            # Fecha o gerador na própria thread (ex.: down.py encerra o Chrome)
+            close = getattr(image_iter, "close", None)
+            if close:
+                close()
+
+    # ---------------- Etapa 1: OCR ----------------
+    def ocr_worker():
+        while True:
+            job = get(page_q)
+            if job is end:
+                put(ocr_q, end)
+                return
+
+            idx, item = job
+            page = {"idx": idx, "item": item, "img": None, "gray": None, "regions": None,
+                    "translations": None, "error": None}
+            if not isinstance(item, DonePage):
+                try:
+                    name = page_name(item)
+                    if manifest is not None:
+                        manifest.record_source(name, item)
+                    img = load_page_image(item)
+                    if img is not None:
+                        # Tons de cinza calculados uma vez: detecção, OCR e remoção do texto
+                        gray = page_gray(img)
+                        regions = manifest.cached_regions(name) if manifest is not None else None
+                        if regions is None:
+                            regions = ocr_page_regions(img, ocr_lang, gray=gray)
+                            if manifest is not None:
+                                manifest.record_regions(name, regions)
+                        page.update(img=img, gray=gray, regions=regions)
+                        if manifest is not None:
+                            page["translations"] = manifest.cached_translations(name)
+                except Exception as e:
+                    page["error"] = e
+
+            if not put(ocr_q, page):
+                return
+
+    # ---------------- Etapa 2: Tradução ----------------
+    def flush(pending):
+        texts = [r["text"] for page in pending for r in page["regions"]]
+        try:
+            translations = translate_texts(texts, translator.translate, translator.translate_batch)
+        except Exception as e:
+            print(f"⚠️ Erro na tradução do lote: {e}")
+            translations = texts
+
+        pos = 0
+        for page in pending:
+            n = len(page["regions"])
+            page["translations"] = translations[pos:pos + n]
+            if manifest is not None:
+                manifest.record_translations(page_name(page["item"]), texts[pos:pos + n],
+                                             page["translations"])
+            pos += n
+            if not put(render_q, page):
+                return False
+        return True
+
+    def model_worker():
+        finished = 0
+        while finished < n_ocr:
+            # Bloqueia só pelo primeiro item; depois drena o que já estiver pronto
+            pending = []
+            tokens = 0
+            page = get(ocr_q)
+            while True:
+                if page is end:
+                    if stop.is_set():
+                        return
+                    finished += 1
+                elif page["regions"] and page["translations"] is None and page["error"] is None:
+                    pending.append(page)
+                    tokens += sum(count_tokens(r["text"]) for r in page["regions"])
+                elif not put(render_q, page):
+                    # Nada para traduzir (ou já traduzido no job) → direto para o desenho
+                    return
+
+                if finished >= n_ocr or tokens >= TRANSLATION_TOKEN_BUDGET \
+                        or len(pending) >= PIPELINE_QUEUE_SIZE:
+                    break
+                try:
+                    page = ocr_q.get_nowait()
+                except queue.Empty:
+                    break
+
+            if pending and not flush(pending):
+                return
+        put(render_q, end)
+
+    # ---------------- Etapa 3: Desenho (thread de quem consome) ----------------
+    def render(page):
+        item = page["item"]
+        if isinstance(item, DonePage):
+            return item
+
+        name = page_name(item)
+        if page["error"] is None and page["img"] is not None:
+            try:
+                img = render_page_regions(page["img"], page["regions"], page["translations"] or [], font_path,
+                                          gray=page["gray"])
+                out = save_page_output(item, img, workspace, changed=bool(page["regions"]))
+                if manifest is not None:
+                    manifest.store_output(name, out)
+                return out
+            except Exception as e:
+                page["error"] = e
+
+        if page["error"] is None:
+            return None  # imagem não abriu
+
+        print(f"❌ Erro ao traduzir a página {item}: {page['error']} (entra sem tradução)")
+        if manifest is not None:
+            manifest.record_failure(name, page["error"])
+        return item
+
+    threads = [threading.Thread(target=feeder, daemon=True), threading.Thread(target=model_worker, daemon=True)]
+    threads += [threading.Thread(target=ocr_worker, daemon=True) for _ in range(n_ocr)]
+    for t in threads:
+        t.start()
+
+    ready = {}
+    next_idx = 0
+    try:
+        while True:
+            page = get(render_q)
+            if page is end:
+                break
+            ready[page["idx"]] = render(page)
+            page["img"] = page["gray"] = None
+
+            # Entrega na ordem de image_iter
+            while next_idx in ready:
+                out = ready.pop(next_idx)
+                next_idx += 1
+                in_flight.release()
+                yield out
+
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+
+
+def _token_counter(translator):
+    """Conta tokens com o tokenizer do tradutor (NLLB) ou, na falta dele, por palavras."""
+    token_fn = getattr(translator, "count_tokens", None)
+
+    def count_tokens(text):
+        try:
+            return token_fn(text) if token_fn else len(text.split())
+        except Exception:
+            return len(text.split())
+
+    return count_tokens
+
+
+# ======================================================
+# 2c) Pool de processos: OCR/desenho nos filhos, tradução no pai
+# ======================================================
+def _translate_process_pool(image_list, translator, ocr_lang, font_path, callback=None, workers=2,
+                            workspace=None, manifest=None):
+    """
+    Espalha o OCR e o desenho das páginas por um pool de processos.
+    Os filhos só recebem caminhos e devolvem regiões (texto + caixas);
+    o processo principal junta os textos de várias páginas, traduz em lote
+    e manda cada página de volta ao pool para ser desenhada.
+
+    - A ordem das páginas na saída é a ordem de image_list.
+    - O callback roda no processo/thread de quem chamou, uma vez por página.
+    - Erro em uma página não derruba as outras: a página original entra sem
+      tradução e fica como falha no job.
+    - Com manifest, páginas prontas (DonePage) passam direto e o OCR/traduções
+      de execuções anteriores são reaproveitados.
+    """
+    total = len(image_list)
+    if total == 0:
+        return []
+
+    count_tokens = _token_counter(translator)
+    results = {}
+    done = 0
+
+    def page_done():
+        nonlocal done
+        done += 1
+        if callback:
+            callback(done, total)
+
+    # spawn: o processo pai já tem threads (downloads, outros capítulos, SQLite);
+    # um fork copiaria locks presos por elas e o filho poderia travar
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        ocr_futs = {}
+        render_futs = {}
+        active = set()
+
+        pending = []
+        tokens = 0
+
+        def submit_render(idx, regions, translations):
+            fut = pool.submit(render_page_task, image_list[idx], regions, translations, font_path, workspace)
+            render_futs[fut] = idx
+            active.add(fut)
+
+        def flush():
+            # Traduz no processo principal todas as páginas acumuladas
+            nonlocal pending, tokens
+            texts = [r["text"] for _, regions in pending for r in regions]
+            translations = translate_texts(texts, translator.translate, translator.translate_batch)
+
+            pos = 0
+            for idx, regions in pending:
+                n = len(regions)
+                if manifest is not None:
+                    manifest.record_translations(page_name(image_list[idx]), texts[pos:pos + n],
+                                                 translations[pos:pos + n])
+                submit_render(idx, regions, translations[pos:pos + n])
+                pos += n
+
+            pending = []
+            tokens = 0
+
+        for idx, item in enumerate(image_list):
+            if isinstance(item, DonePage):
+                results[idx] = item.path
+                page_done()
+                continue
+
+            regions = translations = None
+            if manifest is not None:
+                name = page_name(item)
+                manifest.record_source(name, item)
+                regions = manifest.cached_regions(name)
+                translations = manifest.cached_translations(name)
+
+            if regions is None:
+                ocr_futs[pool.submit(ocr_page_task, item, ocr_lang)] = idx
+            elif translations is None:
+                pending.append((idx, regions))
+                tokens += sum(count_tokens(r["text"]) for r in regions)
+            else:
+                submit_render(idx, regions, translations)
+
+        active.update(ocr_futs)
+        ocr_left = len(ocr_futs)
+        if pending and ocr_left == 0:
+            flush()
+
+        while active:
+            finished, active = wait(active, return_when=FIRST_COMPLETED)
+
+            for fut in finished:
+                if fut in ocr_futs:
+                    idx = ocr_futs.pop(fut)
+                    ocr_left -= 1
+                    failed = False
+                    try:
+                        regions, stats = fut.result()
+                        merge_task_stats(stats)
+                    except Exception as e:
+                        print(f"❌ Erro no OCR da página {image_list[idx]}: {e} (entra sem tradução)")
+                        regions, failed = None, True
+
+                    if regions is None:
+                        if manifest is not None:
+                            manifest.record_failure(page_name(image_list[idx]), "OCR")
+                        if failed:
+                            # Imagem abriu mas o OCR falhou: a página original vai para o PDF
+                            results[idx] = image_list[idx]
+                        page_done()
+                        continue
+
+                    if manifest is not None:
+                        manifest.record_regions(page_name(image_list[idx]), regions)
+                    pending.append((idx, regions))
+                    tokens += sum(count_tokens(r["text"]) for r in regions)
+                else:
+                    idx = render_futs.pop(fut)
+                    try:
+                        out, stats = fut.result()
+                        merge_task_stats(stats)
+                        if out:
+                            results[idx] = out
+                            if manifest is not None:
+                                manifest.store_output(page_name(image_list[idx]), out)
+                    except Exception as e:
+                        print(f"❌ Erro ao desenhar a página {image_list[idx]}: {e} (entra sem tradução)")
+                        if manifest is not None:
+                            manifest.record_failure(page_name(image_list[idx]), e)
+                        results[idx] = image_list[idx]
+                    page_done()
+
+            # Traduz quando o lote enche ou o OCR acabou
+            if pending and (tokens >= TRANSLATION_TOKEN_BUDGET or ocr_left == 0):
+                flush()
+
+    # Mantém a ordem original das páginas
+    return [results[i] for i in sorted(results)]
+
+
 # ======================================================
 # 3) Criar PDF final
 # ======================================================
-def export_pdf(translated_images, output_folder, chapter_name):
+def export_pdf(translated_images, output_folder, chapter_name, workspace=None):
     """
     Gera um PDF no diretório de saída com nome chapter_name.pdf
     """
     pdf_path = os.path.join(output_folder, chapter_name + ".pdf")
-    generate_pdf(translated_images, pdf_path)
+    generate_pdf(translated_images, pdf_path, workspace)
+    return pdf_path
+
+
+# ======================================================
+# 4) Fluxo contínuo: download → tradução → PDF
+# ======================================================
+def translate_chapter_streaming(source, lang_choice, font_path, output_folder, chapter_name, callback=None,
+                                engine=None, workspace=None, in_memory=None, manifest=None, model_slot=None):
+    """
+    source: URL do capítulo ou pasta local com as imagens.
+
+    Executa as três etapas ao mesmo tempo, página por página:
+
+        [download] --fila--> [OCR → tradução → desenho] --fila--> [PDF (thread de quem chamou)]
+
+    A etapa do meio é iter_translated_pages: os lotes de tradução juntam textos
+    de várias páginas.
+
+    Cada página vai para o PDF assim que fica pronta; as filas são limitadas
+    (PIPELINE_QUEUE_SIZE), então um download rápido não acumula páginas na memória.
+    callback(páginas_no_pdf, total_conhecido) roda na thread de quem chamou.
+
+    Com workspace, o PDF é montado dentro da pasta da execução e só vai para
+    output_folder quando termina.
+
+    in_memory (padrão: PAGES_IN_MEMORY): as páginas vão do download ao PDF como
+    bytes/arrays, sem arquivos intermediários.
+
+    manifest (JobManifest): páginas prontas de uma execução anterior não são
+    baixadas nem traduzidas de novo; entram no PDF a partir do job.
+
+    model_slot: ver get_translator.
+
+    Retorna o caminho do PDF, ou None se nenhuma página foi traduzida.
+    """
+    workspace = workspace or Workspace.legacy()
+    in_memory = PAGES_IN_MEMORY if in_memory is None else in_memory
+    io_before = IO_STATS.snapshot()
+    ocr_before = OCR_STATS.snapshot()
+    # OCR e tradução se alternam na mesma thread: o torch fica com todos os núcleos
+    translator, ocr_lang = get_translator(lang_choice, engine, workers=1, model_slot=model_slot)
+
+    os.makedirs(workspace.output_dir, exist_ok=True)
+
+    final_path = os.path.join(output_folder, chapter_name + ".pdf")
+    pdf_path = os.path.join(workspace.root, chapter_name + ".pdf.part")
+    total = [0]
+
+    def on_download(cur, tot):
+        total[0] = tot
+
+    start = time.time()
+    first_page = None
+    done = 0
+
+    if os.path.isdir(source):
+        images = iter_folder_images(source, workspace, in_memory, on_download, manifest)
+    else:
+        images = iter_chapter_images(source, on_download, workspace=workspace, in_memory=in_memory,
+                                     manifest=manifest)
+
+    downloads = _threaded(images, PIPELINE_QUEUE_SIZE)
+    pages = _threaded(iter_translated_pages(downloads, translator, ocr_lang, font_path, workspace, manifest),
+                      PIPELINE_QUEUE_SIZE)
+
+    with StreamingPdfWriter(pdf_path) as writer:
+        for out in pages:
+            if out:
+                try:
+                    writer.add_page(out)
+                except Exception as e:
+                    print(f"❌ Erro ao abrir a imagem {out}: {e}")
+                if isinstance(out, Page):
+                    out.release()
+                if first_page is None and writer.page_count:
+                    first_page = time.time() - start
+
+            done += 1
+            if callback:
+                callback(done, max(total[0], done))
+
+        added = writer.page_count
+
+    _print_memory_stats(translator)
+    _print_io_stats(io_before, ocr_before)
+
+    if not added:
+        os.remove(pdf_path)
+        return None
+
+    if pdf_path != final_path:
+        shutil.move(pdf_path, final_path)
+
+    print(f"⏱️ Primeira página no PDF: {first_page:.1f}s • Total: {time.time() - start:.1f}s")
+    print(f"✅ PDF gerado com sucesso: {final_path}")
+    return final_path
+
+
+def _threaded(iterable, maxsize):
+    """
+    Consome `iterable` em uma thread separada e entrega os itens por uma fila limitada.
+    Exceções da thread são repassadas para quem consome. Se o consumidor parar
+    antes do fim, a thread de trás é liberada (não fica presa na fila cheia).
+    """
+    q = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    end = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((end, None))
+        except Exception as e:
+            put((end, e))
+        finally:
+            # Fecha o gerador na própria thread (ex.: down.py encerra o Chrome)
+            close = getattr(iterable, "close", None)
+            if close:
+                close()
+
+    threading.Thread(target=run, daemon=True).start()
+
+    try:
+        while True:
+            item, error = q.get()
+            if item is end:
+                if error:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+# ======================================================
+# 5) Ponto de entrada único (GUI, CLI e lotes)
+# ======================================================
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+
+def list_folder_images(folder):
+    """Imagens de uma pasta local, em ordem de nome."""
+    return sorted(
+        os.path.join(folder, f) for f in os.listdir(folder)
+        if f.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def translate_chapter(source, lang_choice, output_folder, chapter_name, engine=None,
+                      font_path=FONT_PATH, workers=None, callback=None, model_slot=None, resumable=None):
+    """
+    Traduz um capítulo inteiro e gera o PDF. Não depende de Tkinter.
+
+    source: URL do capítulo ou pasta local com as imagens
+    callback(etapa, atual, total): etapa = "download" | "traducao" | "pdf"
+    workers: processos para OCR/desenho (1 = fluxo contínuo download → tradução → PDF)
+    model_slot: context manager adquirido a cada chamada ao modelo NLLB
+                (permite limitar quantos capítulos usam o modelo ao mesmo tempo)
+    resumable (padrão: RESUMABLE_JOBS): guarda um manifesto por página em JOBS_FOLDER;
+               se a execução falhar no meio, rodar de novo refaz só o que faltou
+
+    Retorna o caminho do PDF ou None.
+    """
+    workers = PAGE_WORKERS if workers is None else workers
+    resumable = RESUMABLE_JOBS if resumable is None else resumable
+    os.makedirs(output_folder, exist_ok=True)
+
+    def report(stage):
+        return (lambda cur, tot: callback(stage, cur, tot)) if callback else None
+
+    manifest = JobManifest.for_chapter(source, lang_choice, engine or TRANSLATION_MODE) if resumable else None
+    if manifest is not None and manifest.resumed:
+        print(f"♻️ Retomando job anterior: {_format_counts(manifest.counts())}")
+
+    pdf_path = None
+    try:
+        pdf_path = _translate_chapter(source, lang_choice, output_folder, chapter_name, engine,
+                                      font_path, workers, callback, model_slot, manifest, report)
+    finally:
+        if manifest is not None:
+            _finish_job(manifest, pdf_path)
+
     return pdf_path
+
+
+def _translate_chapter(source, lang_choice, output_folder, chapter_name, engine, font_path, workers,
+                       callback, model_slot, manifest, report):
+    # Cada execução usa as próprias pastas: vários capítulos podem rodar juntos
+    with Workspace(name=chapter_name) as ws:
+        if workers <= 1:
+            # Fluxo contínuo (URL ou pasta): com PAGES_IN_MEMORY, nada vai para o disco além do PDF
+            return translate_chapter_streaming(
+                source, lang_choice, font_path, output_folder, chapter_name,
+                callback=report("traducao"), engine=engine, workspace=ws, manifest=manifest,
+                model_slot=model_slot
+            )
+
+        # Pool de processos: os filhos leem as páginas do disco
+        if os.path.isdir(source):
+            images = list(iter_folder_images(source, ws, callback=report("download"), manifest=manifest))
+        else:
+            images = download_chapter_images(source, callback=report("download"), workspace=ws,
+                                             manifest=manifest)
+
+        if not images:
+            return None
+
+        translated = translate_chapter_images(
+            images, lang_choice, font_path,
+            callback=report("traducao"), workers=workers, engine=engine, workspace=ws,
+            manifest=manifest, model_slot=model_slot
+        )
+
+        if not translated:
+            return None
+
+        pdf_path = export_pdf(translated, output_folder, chapter_name, ws)
+        if callback:
+            callback("pdf", 1, 1)
+        return pdf_path
+
+
+def _format_counts(counts):
+    names = {"done": "prontas", "partial": "sem tradução completa", "failed": "com falha", "pending": "pendentes"}
+    return ", ".join(f"{n} {names.get(status, status)}" for status, n in sorted(counts.items()))
+
+
+def _finish_job(manifest, pdf_path):
+    """
+    Job completo e PDF gerado → apaga (a menos que JOBS_KEEP_DONE).
+    Senão fica para a próxima execução (que refaz o PDF com as páginas guardadas e
+    redesenha as outras a partir do OCR e das traduções do job).
+    """
+    manifest.flush()
+    if pdf_path and manifest.complete:
+        if not JOBS_KEEP_DONE:
+            manifest.remove()
+        return
+    if manifest.data["pages"]:
+        print(f"🧾 Job salvo em {manifest.folder} ({_format_counts(manifest.counts())}). "
+              f"Rode de novo para refazer só o que faltou.")
@@ -0,0 +1,186 @@
+import os
+import shlex
+import threading
+
+import numpy as np
+import pytesseract
+
+import config
+
+# Colunas do TSV do Tesseract (mesmo formato do pytesseract.image_to_data)
+TSV_INT_FIELDS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                  "left", "top", "width", "height")
+
+
+def parse_tess_config(tess_config):
+    """'--psm 6 -c chave=valor' → (psm, {chave: valor})."""
+    psm, variables = None, {}
+    args = shlex.split(tess_config or "")
+    for i, arg in enumerate(args):
+        if arg == "--psm" and i + 1 < len(args):
+            psm = int(args[i + 1])
+        elif arg == "-c" and i + 1 < len(args) and "=" in args[i + 1]:
+            key, value = args[i + 1].split("=", 1)
+            variables[key] = value
+    return psm, variables
+
+
+def parse_tsv(tsv):
+    """TSV do Tesseract → dict de listas (como pytesseract.Output.DICT)."""
+    lines = [line.split("\t") for line in tsv.splitlines() if line.strip()]
+    if lines and lines[0][0] == "level":
+        lines = lines[1:]
+
+    data = {k: [] for k in TSV_INT_FIELDS + ("conf", "text")}
+    for cols in lines:
+        if len(cols) < 11:
+            continue
+        for k, v in zip(TSV_INT_FIELDS, cols):
+            data[k].append(int(v))
+        data["conf"].append(float(cols[10]))
+        data["text"].append(cols[11] if len(cols) > 11 else "")
+    return data
+
+
+# -------------------------------------------------------------
+# 🐢 pytesseract: um processo tesseract por chamada (sempre disponível)
+# -------------------------------------------------------------
+class PytesseractBackend:
+    name = "pytesseract"
+
+    def image_to_string(self, img, lang, tess_config=""):
+        return pytesseract.image_to_string(img, lang=lang, config=tess_config)
+
+    def image_to_data(self, img, lang, tess_config=""):
+        return pytesseract.image_to_data(img, lang=lang, config=tess_config, output_type=pytesseract.Output.DICT)
+
+    def version(self):
+        return str(pytesseract.get_tesseract_version())
+
+
+# -------------------------------------------------------------
+# ⚡ tesserocr: motor dentro do processo, modelo carregado uma vez
+# -------------------------------------------------------------
+class TesserocrBackend:
+    """
+    Usa a API C do Tesseract via tesserocr. Cada thread mantém um motor aberto
+    por (idioma, psm, variáveis): o traineddata é carregado uma vez só, e as
+    imagens vão direto da memória (array NumPy), sem arquivo temporário.
+    """
+    name = "tesserocr"
+
+    def __init__(self, tessdata=None, fallback=None):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.tessdata = tessdata or _default_tessdata()
+        self.fallback = fallback
+        self._local = threading.local()
+        self._failed_langs = set()
+
+    def _api(self, lang, tess_config):
+        psm, variables = parse_tess_config(tess_config)
+        key = (lang, psm, tuple(sorted(variables.items())))
+
+        engines = getattr(self._local, "engines", None)
+        if engines is None:
+            engines = self._local.engines = {}
+
+        api = engines.get(key)
+        if api is None:
+            kwargs = {"lang": lang}
+            if self.tessdata:
+                kwargs["path"] = self.tessdata
+            api = self._tesserocr.PyTessBaseAPI(**kwargs)
+            if psm is not None:
+                api.SetPageSegMode(psm)
+            for name, value in variables.items():
+                api.SetVariable(name, value)
+            engines[key] = api
+        return api
+
+    def _set_image(self, api, img):
+        img = np.ascontiguousarray(img)
+        h, w = img.shape[:2]
+        bpp = 1 if img.ndim == 2 else img.shape[2]
+        api.SetImageBytes(img.tobytes(), w, h, bpp, w * bpp)
+
+    def _api_or_fallback(self, lang, tess_config):
+        """Motor do idioma, ou None se ele não abre e há fallback (ex.: traineddata fora do tessdata)."""
+        if lang in self._failed_langs:
+            return None
+        try:
+            return self._api(lang, tess_config)
+        except RuntimeError as e:
+            if self.fallback is None:
+                raise
+            self._failed_langs.add(lang)
+            print(f"⚠️ tesserocr não abriu o idioma {lang} ({e}); usando pytesseract")
+            return None
+
+    def image_to_string(self, img, lang, tess_config=""):
+        api = self._api_or_fallback(lang, tess_config)
+        if api is None:
+            return self.fallback.image_to_string(img, lang, tess_config)
+
+        self._set_image(api, img)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def image_to_data(self, img, lang, tess_config=""):
+        api = self._api_or_fallback(lang, tess_config)
+        if api is None:
+            return self.fallback.image_to_data(img, lang, tess_config)
+
+        self._set_image(api, img)
+        try:
+            api.Recognize()
+            return parse_tsv(api.GetTSVText(0))
+        finally:
+            api.Clear()
+
+    def version(self):
+        # "tesseract 5.3.0\n leptonica-..." → "5.3.0"
+        return self._tesserocr.tesseract_version().splitlines()[0].split()[-1]
+
+
+def _default_tessdata():
+    """TESSDATA_PATH do config ou a pasta tessdata ao lado do executável do tesseract."""
+    if config.TESSDATA_PATH:
+        return config.TESSDATA_PATH
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    folder = os.path.join(os.path.dirname(cmd), "tessdata") if os.path.dirname(cmd) else None
+    return folder if folder and os.path.isdir(folder) else None
+
+
+# ------------------------------------------------------------
+# Escolha do backend (um por processo)
+# ------------------------------------------------------------
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_ocr_backend():
+    """
+    OCR_BACKEND = "tesserocr" | "pytesseract" | "auto".
+    "auto" usa o tesserocr quando estiver instalado e cai para o pytesseract se não.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = _build_backend(config.OCR_BACKEND)
+        return _backend
+
+
+def _build_backend(choice):
+    if choice == "pytesseract":
+        return PytesseractBackend()
+
+    try:
+        return TesserocrBackend(fallback=PytesseractBackend() if choice == "auto" else None)
+    except Exception as e:
+        if choice == "tesserocr":
+            raise
+        print(f"⚠️ tesserocr indisponível ({e}); usando pytesseract (um processo por chamada)")
+        return PytesseractBackend()
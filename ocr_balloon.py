@@ -1,62 +1,358 @@
 import cv2
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
-import pytesseract
+from PIL import Image, ImageDraw
 import os
+from functools import lru_cache
+
+from text_layout import get_font, layout_text, LINE_SPACING
+from page_buffer import IO_STATS, IOStats, Page, read_image, write_image
+from ocr_cache import get_ocr_cache, image_digest, ocr_cache_key
+from ocr_backend import get_ocr_backend
+from text_presence import has_text
 
 # Tenta importar configurações
 try:
-    from config import FONT_PATH, TEMP_FOLDER, TEMP_OUT
+    from config import FONT_PATH, TEMP_FOLDER, TEMP_OUT, TILE_HEIGHT, TILE_OVERLAP, SAVE_DEBUG_PAGES, \
+        OCR_SINGLE_PASS, PAGE_TEXT_CLEANUP, FLAT_FILL_MIN_LEVEL, FLAT_FILL_MAX_STD, DETECT_SCALE, \
+        OCR_PREFILTER, OCR_PREFILTER_MIN_GLYPHS
 except Exception:
     FONT_PATH = None
     TEMP_FOLDER = "capitulo_temp"
     TEMP_OUT = TEMP_FOLDER + "_out"
+    TILE_HEIGHT = 3000
+    TILE_OVERLAP = 300
+    SAVE_DEBUG_PAGES = False
+    OCR_SINGLE_PASS = False
+    PAGE_TEXT_CLEANUP = True
+    FLAT_FILL_MIN_LEVEL = 200
+    FLAT_FILL_MAX_STD = 12
+    DETECT_SCALE = 0.5
+    OCR_PREFILTER = True
+    OCR_PREFILTER_MIN_GLYPHS = 1
 
-def get_font(font_path, size):
-    try:
-        return ImageFont.truetype(font_path, size)
-    except:
-        return ImageFont.load_default()
+def page_gray(img_bgr):
+    """
+    Tons de cinza da página, calculados uma vez e compartilhados pela detecção
+    de balões, pelo pré-processamento do OCR e pela remoção do texto.
+    """
+    return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+
+def _balloon_mask(gray, scale=1.0):
+    """Blur + threshold do branco do papel + dilatação (núcleos proporcionais à escala)."""
+    blur_size = max(3, int(7 * scale) | 1)
+    kernel_size = max(3, int(5 * scale) | 1)
+    blur = cv2.GaussianBlur(gray, (blur_size, blur_size), 0)
+    # Threshold alto para pegar apenas o branco do papel do balão
+    _, th = cv2.threshold(blur, 210, 255, cv2.THRESH_BINARY)
+
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+    return cv2.dilate(th, kernel, iterations=2)
+
+def _is_balloon(contour, min_area, scale=1.0):
+    x, y, w, h = cv2.boundingRect(contour)
+    area = cv2.contourArea(contour)
+
+    # Filtros mais rígidos para considerar como balão
+    if area >= min_area * scale * scale and w > 50 * scale and h > 25 * scale:
+        # Solidez = Area do contorno / Area do Bounding Box
+        solidity = float(area) / (w * h)
+        # Balões reais costumam ser sólidos (>0.6). Texto solto é espalhado (<0.5).
+        return solidity > 0.45
+    return False
+
+# Fração máxima da faixa que um balão pode ocupar (mais que isso é fundo/calha)
+BALLOON_MAX_AREA_RATIO = 0.5
 
-def detect_balloons_contours(img_bgr, min_area=3000):
+def _plausible_balloon(box, shape):
+    """
+    Descarta "balões" que são o fundo branco: caixa de borda a borda na
+    largura (calha entre quadros, faixa em branco) ou maior que
+    BALLOON_MAX_AREA_RATIO da imagem. Sem isso a passada única de OCR
+    jogaria todas as palavras da faixa dentro de um único balão.
+    """
+    H, W = shape[:2]
+    x, y, w, h = box
+    if x <= 0 and x + w >= W:
+        return False
+    return w * h <= BALLOON_MAX_AREA_RATIO * W * H
+
+def detect_balloons_contours(img_bgr, min_area=3000, gray=None, scale=None):
     """
     Detecta APENAS balões claros e definidos.
     Usa 'solidez' para diferenciar um balão redondo de um texto solto espalhado.
+
+    scale (padrão: DETECT_SCALE) < 1: os candidatos saem da página reduzida e
+    cada caixa é refinada na resolução original, só no recorte em volta dela.
+    gray: tons de cinza da página (page_gray), se já calculados.
     """
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (7, 7), 0)
-    # Threshold alto para pegar apenas o branco do papel do balão
-    _, th = cv2.threshold(blur, 210, 255, cv2.THRESH_BINARY)
-    
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-    dil = cv2.dilate(th, kernel, iterations=2)
-    
-    contours, _ = cv2.findContours(dil, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    boxes = []
+    gray = page_gray(img_bgr) if gray is None else gray
+    scale = DETECT_SCALE if scale is None else scale
+    if not scale or scale >= 1 or min(gray.shape[:2]) * scale < 64:
+        return _detect_full(gray, min_area)
+
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    contours, _ = cv2.findContours(_balloon_mask(small, scale), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = set()
     for c in contours:
-        x, y, w, h = cv2.boundingRect(c)
-        area = cv2.contourArea(c)
-        
-        # Filtros mais rígidos para considerar como balão
-        if area >= min_area and w > 50 and h > 25:
-            # Solidez = Area do contorno / Area do Bounding Box
-            solidity = float(area) / (w * h)
-            # Balões reais costumam ser sólidos (>0.6). Texto solto é espalhado (<0.5).
-            if solidity > 0.45: 
-                boxes.append((x, y, w, h))
-                
-    return sorted(boxes, key=lambda b: b[1])
+        # Candidato com filtro mais frouxo (a decisão final é na resolução original)
+        if _is_balloon(c, min_area * 0.7, scale * 0.8):
+            x, y, w, h = cv2.boundingRect(c)
+            box = (int(x / scale), int(y / scale), int(np.ceil(w / scale)), int(np.ceil(h / scale)))
+            boxes.update(_refine_box(gray, box, min_area))
+
+    return sorted((b for b in boxes if _plausible_balloon(b, gray.shape)), key=lambda b: b[1])
+
+def _detect_full(gray, min_area):
+    contours, _ = cv2.findContours(_balloon_mask(gray), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = [cv2.boundingRect(c) for c in contours if _is_balloon(c, min_area)]
+    boxes = [b for b in boxes if _plausible_balloon(b, gray.shape)]
+    return sorted((tuple(int(v) for v in b) for b in boxes), key=lambda b: b[1])
+
+def _refine_box(gray, box, min_area):
+    """
+    Refaz a detecção na resolução original num recorte em volta do candidato.
+    Contornos que encostam na borda do recorte (e não na da página) estão
+    cortados: tenta de novo com uma margem maior e, no fim, usa a página inteira.
+    """
+    H, W = gray.shape[:2]
+    x, y, w, h = box
+    for pad in (16, 64, None):
+        if pad is None:
+            x0, y0, x1, y1 = 0, 0, W, H
+        else:
+            x0, y0 = max(0, x - pad), max(0, y - pad)
+            x1, y1 = min(W, x + w + pad), min(H, y + h + pad)
+
+        contours, _ = cv2.findContours(_balloon_mask(gray[y0:y1, x0:x1]), cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_SIMPLE)
+        found, cut = [], False
+        for c in contours:
+            cx, cy, cw, ch = cv2.boundingRect(c)
+            # Só os contornos do candidato (centro dentro da caixa reduzida)
+            if not (x <= x0 + cx + cw // 2 <= x + w and y <= y0 + cy + ch // 2 <= y + h):
+                continue
+            if (cx == 0 and x0 > 0) or (cy == 0 and y0 > 0) or \
+                    (cx + cw == x1 - x0 and x1 < W) or (cy + ch == y1 - y0 and y1 < H):
+                cut = True
+                break
+            if _is_balloon(c, min_area):
+                found.append((x0 + cx, y0 + cy, cw, ch))
+        if not cut:
+            return found
+    return found
+
+# ------------------------------------------------------------
+# Processamento em faixas (webtoons muito altos)
+# ------------------------------------------------------------
+def page_tiles(height, tile_height=None, overlap=None):
+    """
+    Divide a altura da página em faixas horizontais sobrepostas.
+    Retorna [(y0, y1, core0, core1)], onde [core0, core1) é a "área própria"
+    de cada faixa: as áreas próprias não se sobrepõem e cobrem a página inteira,
+    então cada palavra/balão pertence a exatamente uma faixa.
+    """
+    if not tile_height or height <= tile_height:
+        return [(0, height, 0, height)]
+
+    overlap = max(0, min(overlap or 0, tile_height // 2))
+    step = tile_height - overlap
+    spans = []
+    y0 = 0
+    while True:
+        y1 = min(height, y0 + tile_height)
+        spans.append((y0, y1))
+        if y1 >= height:
+            break
+        y0 += step
+
+    tiles = []
+    core0 = 0
+    for k, (y0, y1) in enumerate(spans):
+        core1 = height if k == len(spans) - 1 else y1 - overlap // 2
+        tiles.append((y0, y1, core0, core1))
+        # A próxima área própria começa onde esta termina (overlap ímpar não cria linha duplicada)
+        core0 = core1
+    return tiles
+
+def _intersection(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    return max(0, iw) * max(0, ih)
+
+def _iou(a, b):
+    inter = _intersection(a, b)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+def _merge_fragments(fragments):
+    """Une pedaços de balões cortados na emenda entre faixas (caixas que se tocam/sobrepõem)."""
+    merged = [list(f) for f in fragments]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                ax, ay, aw, ah = merged[i]
+                bx, by, bw, bh = merged[j]
+                h_overlap = min(ax + aw, bx + bw) - max(ax, bx)
+                v_gap = max(ay, by) - min(ay + ah, by + bh)
+                if h_overlap > 0.5 * min(aw, bw) and v_gap <= 2:
+                    x1, y1 = min(ax, bx), min(ay, by)
+                    x2, y2 = max(ax + aw, bx + bw), max(ay + ah, by + bh)
+                    merged[i] = [x1, y1, x2 - x1, y2 - y1]
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return [tuple(m) for m in merged]
+
+def detect_balloons_tiled(img_bgr, tiles, min_area=3000, gray=None):
+    """
+    detect_balloons_contours faixa por faixa, com junção na emenda:
+        - balões inteiros dentro de uma faixa: duplicatas (vistas nas duas faixas
+          da sobreposição) são removidas por IoU
+        - pedaços cortados pela borda de uma faixa: descartados se outra faixa viu
+          o balão inteiro; senão (balão maior que a sobreposição) são unidos
+    """
+    gray = page_gray(img_bgr) if gray is None else gray
+    if len(tiles) == 1:
+        return detect_balloons_contours(img_bgr, min_area, gray)
+
+    full, cut = [], []
+    last = len(tiles) - 1
+    for k, (y0, y1, _, _) in enumerate(tiles):
+        for (x, y, w, h) in detect_balloons_contours(img_bgr[y0:y1], min_area, gray[y0:y1]):
+            touches = (k > 0 and y <= 0) or (k < last and y + h >= y1 - y0)
+            (cut if touches else full).append((x, y + y0, w, h))
+
+    kept = []
+    for box in full:
+        if all(_iou(box, b) < 0.5 for b in kept):
+            kept.append(box)
+
+    fragments = [
+        f for f in cut
+        if not any(_intersection(f, b) >= 0.8 * f[2] * f[3] for b in kept)
+    ]
+    kept.extend(_merge_fragments(fragments))
+    return sorted(kept, key=lambda b: b[1])
+
+def _merge_seam_blocks(blocks, max_gap=25):
+    """Une blocos de texto solto que a emenda entre duas faixas partiu ao meio."""
+    blocks = sorted(blocks, key=lambda b: (b['tile'], b['box'][1]))
+    merged = []
+    for b in blocks:
+        for m in merged:
+            if m['tile'] != b['tile'] - 1:
+                continue
+            mx1, my1, mx2, my2 = m['box']
+            bx1, by1, bx2, by2 = b['box']
+            h_overlap = min(mx2, bx2) - max(mx1, bx1)
+            if h_overlap > 0 and by1 - my2 <= max_gap and by1 >= my1:
+                m['text'].extend(b['text'])
+                m['box'] = [min(mx1, bx1), min(my1, by1), max(mx2, bx2), max(my2, by2)]
+                m['tile'] = b['tile']
+                break
+        else:
+            merged.append(b)
+    return merged
+
+# ------------------------------------------------------------
+# Cache de OCR
+# ------------------------------------------------------------
+# Versão do pré-processamento do OCR. Mude ao alterar extract_text/ocr_page_regions
+# (threshold, psm, campos guardados...): o cache de OCR da versão antiga é descartado.
+OCR_PREPROCESS_VERSION = 3
+
+# Campos do image_to_data guardados no cache (texto + caixa + agrupamento)
+WORD_FIELDS = ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")
+
+# Contadores por processo: ("tesseract", "string"|"data") = chamadas de verdade
+# (sem as respostas do cache) e ("prefilter", "skip") = recortes sem tinta pulados
+OCR_STATS = IOStats()
+
+@lru_cache(maxsize=1)
+def ocr_version():
+    try:
+        tesseract = get_ocr_backend().version()
+    except Exception:
+        tesseract = "?"
+    return f"{OCR_PREPROCESS_VERSION}:{tesseract}"
+
+def _cached_ocr(page_digest, roi, ocr_lang, tess_config, run):
+    """Resultado de run() (JSON) guardado por (página, recorte, idioma, configuração)."""
+    def counted():
+        with OCR_STATS.timed("tesseract", tess_config.split()[0]):
+            return run()
+
+    cache = get_ocr_cache(ocr_version()) if page_digest else None
+    if cache is None:
+        return counted()
+
+    key = ocr_cache_key(page_digest, roi, ocr_lang, tess_config)
+    value = cache.get(key)
+    if value is None:
+        value = counted()
+        cache.put(key, value)
+    return value
+
+def worth_ocr(gray, prefilter=None):
+    """
+    Filtro de tinta (text_presence.has_text) antes do Tesseract.
+    Recorte sem nada com cara de glifo → False (e conta como chamada evitada).
+    """
+    prefilter = OCR_PREFILTER if prefilter is None else prefilter
+    if not prefilter or has_text(gray, OCR_PREFILTER_MIN_GLYPHS):
+        return True
+    OCR_STATS.record("prefilter", "skip")
+    return False
+
+def page_digest_for(img):
+    """Hash da página para o cache de OCR (None se o cache estiver desligado)."""
+    return image_digest(img) if get_ocr_cache(ocr_version()) else None
+
+def extract_text(img_crop, ocr_lang, page_digest=None, roi=None, gray=None):
+    """
+    OCR de um recorte (balão). Retorna o texto reconhecido ou None.
+    Com page_digest/roi (posição do recorte na página), usa o cache de OCR.
+    gray: o mesmo recorte em tons de cinza (fatia de page_gray), se já existir.
+    Recortes sem tinta (worth_ocr) nem chegam ao Tesseract.
+    """
+    gray = cv2.cvtColor(img_crop, cv2.COLOR_BGR2GRAY) if gray is None else gray
+    if not worth_ocr(gray):
+        return None
+
+    def run():
+        crop = cv2.equalizeHist(gray)
+        th = cv2.adaptiveThreshold(crop, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 11, 2)
+
+        # --psm 6 assume um bloco de texto uniforme
+        return get_ocr_backend().image_to_string(th, ocr_lang, "--psm 6")
+
+    text = _cached_ocr(page_digest, roi, ocr_lang, "string --psm 6", run)
+    if not text.strip():
+        return None
+    return text
+
+def extract_words(img, y0, y1, ocr_lang, page_digest=None, gray=None):
+    """
+    image_to_data de uma faixa da página (palavras com caixas), com cache de OCR.
+    Com gray (page_gray), o Tesseract recebe a faixa em tons de cinza (1/3 dos bytes).
+    """
+    def run():
+        data = get_ocr_backend().image_to_data((img if gray is None else gray)[y0:y1], ocr_lang)
+        return {k: list(data[k]) for k in WORD_FIELDS}
+
+    return _cached_ocr(page_digest, (0, y0, img.shape[1], y1 - y0), ocr_lang, "data", run)
 
 def extract_and_translate(img_crop, ocr_lang, translator_func):
     """Função auxiliar para OCR e tradução de um recorte"""
-    gray = cv2.cvtColor(img_crop, cv2.COLOR_BGR2GRAY)
-    gray = cv2.equalizeHist(gray)
-    th = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 11, 2)
-    
-    # --psm 6 assume um bloco de texto uniforme
-    text = pytesseract.image_to_string(th, lang=ocr_lang, config="--psm 6")
-    if not text.strip():
+    text = extract_text(img_crop, ocr_lang)
+    if text is None:
         return None
         
     try:
@@ -65,54 +361,46 @@ def extract_and_translate(img_crop, ocr_lang, translator_func):
         translated = text
     return translated
 
+def translate_texts(texts, translator_func=None, batch_translator_func=None):
+    """
+    Traduz uma lista de textos de uma vez.
+    Usa a função em lote quando disponível; se ela falhar, cai para
+    a tradução individual (e, em último caso, mantém o texto original).
+    """
+    if not texts:
+        return []
+
+    if batch_translator_func:
+        try:
+            return list(batch_translator_func(texts))
+        except Exception as e:
+            print(f"⚠️ Erro na tradução em lote, traduzindo um por um: {e}")
+
+    translated = []
+    for text in texts:
+        try:
+            translated.append(translator_func(text))
+        except:
+            translated.append(text)
+    return translated
+
 def draw_text_in_box(pil_img, box, text, font_path, color=(0,0,0), outline=False):
     """
     Desenha texto ajustado ao box. 
     Se outline=True, faz borda branca (para texto solto sobre arte).
+    O tamanho da fonte e a quebra de linha vêm de text_layout.layout_text (com cache).
     """
     x, y, w, h = box
     draw = ImageDraw.Draw(pil_img)
     
-    # Estimativa inicial de fonte
-    font_size = int(h * 0.4) 
+    font_size, lines, widths, heights, total_h = layout_text(text, w, h, font_path)
     font = get_font(font_path, font_size)
-    
-    # Loop para ajustar tamanho da fonte até caber
-    lines = []
-    while font_size > 8:
-        font = get_font(font_path, font_size)
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        # Algoritmo simples de quebra de linha
-        for word in words:
-            test_line = f"{current_line} {word}".strip()
-            bbox = draw.textbbox((0,0), test_line, font=font)
-            line_w = bbox[2] - bbox[0]
-            if line_w < (w - 4):
-                current_line = test_line
-            else:
-                lines.append(current_line)
-                current_line = word
-        if current_line: lines.append(current_line)
-        
-        # Verifica altura total
-        total_h = sum([draw.textbbox((0,0), l, font=font)[3] - draw.textbbox((0,0), l, font=font)[1] + 4 for l in lines])
-        
-        if total_h <= (h - 4):
-            break
-        font_size -= 2
         
     # Desenhar centralizado
-    total_h = sum([draw.textbbox((0,0), l, font=font)[3] - draw.textbbox((0,0), l, font=font)[1] + 4 for l in lines])
     curr_y = y + (h - total_h) // 2
     
-    for line in lines:
-        bbox = draw.textbbox((0,0), line, font=font)
-        line_w = bbox[2] - bbox[0]
-        line_h = bbox[3] - bbox[1]
-        curr_x = x + (w - line_w) // 2
+    for line, line_w, line_h in zip(lines, widths, heights):
+        curr_x = x + (w - int(line_w)) // 2
         
         if outline:
             # Desenha borda grossa branca para texto solto (simula Stroke)
@@ -121,10 +409,30 @@ def draw_text_in_box(pil_img, box, text, font_path, color=(0,0,0), outline=False
                 draw.text((curr_x + ox, curr_y + oy), line, font=font, fill=(255,255,255))
         
         draw.text((curr_x, curr_y), line, font=font, fill=color)
-        curr_y += line_h + 4
+        curr_y += line_h + LINE_SPACING
 
     return pil_img
 
+def draw_text_in_region(img_bgr, box, text, font_path, color=(0,0,0), outline=False, margin=8):
+    """
+    Mesmo resultado de draw_text_in_box, mas direto no array BGR da página:
+    só o recorte do box (+ margem para a borda/estouro do texto) vira PIL
+    e volta para o array, em vez de converter a página inteira a cada balão.
+    """
+    x, y, w, h = box
+    H, W = img_bgr.shape[:2]
+    x0, y0 = max(0, x - margin), max(0, y - margin)
+    x1, y1 = min(W, x + w + margin), min(H, y + h + margin)
+    if x1 <= x0 or y1 <= y0:
+        return img_bgr
+
+    roi = img_bgr[y0:y1, x0:x1]
+    tile = Image.fromarray(cv2.cvtColor(roi, cv2.COLOR_BGR2RGB))
+    # Coordenadas do box relativas ao recorte
+    tile = draw_text_in_box(tile, (x - x0, y - y0, w, h), text, font_path, color=color, outline=outline)
+    img_bgr[y0:y1, x0:x1] = cv2.cvtColor(np.asarray(tile), cv2.COLOR_RGB2BGR)
+    return img_bgr
+
 def remove_text_content(img_bgr, x, y, w, h):
     """Inpainting simples na região para apagar o texto original"""
     roi = img_bgr[y:y+h, x:x+w]
@@ -141,95 +449,378 @@ def remove_text_content(img_bgr, x, y, w, h):
     img_bgr[y:y+h, x:x+w] = res
     return img_bgr
 
-def process_image_file(image_path, ocr_lang, translator_func, font_path=None, save_out=True):
-    img = cv2.imread(image_path)
-    if img is None: return None
-    
+def clean_text_regions(img_bgr, boxes, radius=4, gray=None):
+    """
+    Apaga o texto de todas as regiões da página de uma vez.
+
+    Monta uma única máscara (mesmo threshold + dilatação 3x3 de
+    remove_text_content, limitada às regiões) e olha o fundo conhecido em volta
+    de cada pixel da máscara (janela de 2*radius+1 px, com filtros de caixa):
+        - fundo claro e liso (balão) → recebe a cor média desse fundo
+        - o resto (texto sobre a arte) → cv2.inpaint, só no recorte de cada
+          grupo de manchas
+    Regiões que se sobrepõem na vertical são tratadas juntas (uma faixa); o
+    espaço vazio entre faixas distantes não entra nas contas.
+    gray: page_gray da página ainda sem alterações (evita recalcular).
+    """
+    H, W = img_bgr.shape[:2]
+    boxes = [(max(0, int(x)), max(0, int(y)), min(W, int(x) + int(w)), min(H, int(y) + int(h)))
+             for x, y, w, h in boxes]
+    boxes = sorted((b for b in boxes if b[2] > b[0] and b[3] > b[1]), key=lambda b: b[1])
+
+    band = []
+    for box in boxes:
+        if band and box[1] > max(b[3] for b in band) + 2 * radius:
+            _clean_band(img_bgr, band, radius, gray)
+            band = []
+        band.append(box)
+    if band:
+        _clean_band(img_bgr, band, radius, gray)
+    return img_bgr
+
+def _clean_band(img_bgr, boxes, radius, gray=None):
+    H, W = img_bgr.shape[:2]
+    ox0 = max(0, min(b[0] for b in boxes) - radius)
+    oy0 = max(0, min(b[1] for b in boxes) - radius)
+    ox1 = min(W, max(b[2] for b in boxes) + radius)
+    oy1 = min(H, max(b[3] for b in boxes) + radius)
+    work = img_bgr[oy0:oy1, ox0:ox1]
+
+    region = np.zeros(work.shape[:2], np.uint8)
+    for x0, y0, x1, y1 in boxes:
+        region[y0-oy0:y1-oy0, x0-ox0:x1-ox0] = 255
+
+    gray = page_gray(work) if gray is None else gray[oy0:oy1, ox0:ox1]
+    _, mask = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
+    mask = cv2.dilate(mask & region, np.ones((3, 3), np.uint8), iterations=1) & region
+    text = mask > 0
+    if not text.any():
+        return
+
+    # Média e desvio do fundo conhecido (fora da máscara) na janela de cada pixel
+    ksize = (2 * radius + 1, 2 * radius + 1)
+    known = (~text).astype(np.float32)
+    g = gray.astype(np.float32) * known
+    count = cv2.boxFilter(known, -1, ksize, normalize=False)
+    safe = np.maximum(count, 1)
+    mean = cv2.boxFilter(g, -1, ksize, normalize=False) / safe
+    var = cv2.boxFilter(g * g, -1, ksize, normalize=False) / safe - mean * mean
+
+    flat = text & (count >= radius) & (mean >= FLAT_FILL_MIN_LEVEL) & (var <= FLAT_FILL_MAX_STD ** 2)
+    if flat.any():
+        ys, xs = np.nonzero(flat)
+        for c in range(3):
+            channel = cv2.boxFilter(work[..., c].astype(np.float32) * known, -1, ksize, normalize=False)
+            work[ys, xs, c] = (channel[ys, xs] / safe[ys, xs]).round().astype(np.uint8)
+
+    # Só o que está sobre a arte passa pelo inpaint (o custo cresce com a área)
+    art = np.where(text & ~flat, 255, 0).astype(np.uint8)
+    if art.any():
+        # Manchas próximas vão no mesmo recorte (menos chamadas, recortes pequenos)
+        near = cv2.dilate(art, np.ones((15, 15), np.uint8))
+        _, _, stats, _ = cv2.connectedComponentsWithStats(near, connectivity=8)
+        for x, y, w, h, _ in stats[1:]:
+            work[y:y+h, x:x+w] = cv2.inpaint(work[y:y+h, x:x+w], art[y:y+h, x:x+w], 3, cv2.INPAINT_TELEA)
+
+def ocr_page_regions(img, ocr_lang, tile_height=None, tile_overlap=None, single_pass=None, gray=None):
+    """
+    Executa todo o OCR da página ANTES de qualquer tradução/desenho.
+    Retorna uma lista de regiões: {"kind": "balloon"|"loose", "box": (x, y, w, h), "text": str}
+    Os balões vêm primeiro (ordenados por y), depois os blocos de texto solto.
+
+    Páginas mais altas que tile_height (padrão: TILE_HEIGHT) são analisadas em
+    faixas sobrepostas de tile_overlap px, então a detecção e o Tesseract nunca
+    recebem a página inteira de uma vez.
+
+    single_pass (padrão: OCR_SINGLE_PASS): o Tesseract roda UMA vez por faixa e
+    cada palavra vai para o balão que contém o seu centro (ou para um bloco de
+    texto solto). Sem ele, cada balão tem o próprio OCR (recorte com threshold)
+    e a página passa de novo pelo Tesseract só para o texto solto.
+
+    gray: page_gray(img), se quem chama já tiver (é reaproveitado no desenho).
+    """
+    tile_height = TILE_HEIGHT if tile_height is None else tile_height
+    tile_overlap = TILE_OVERLAP if tile_overlap is None else tile_overlap
+    single_pass = OCR_SINGLE_PASS if single_pass is None else single_pass
+    tiles = page_tiles(img.shape[0], tile_height, tile_overlap)
+
+    gray = page_gray(img) if gray is None else gray
+
+    regions = []
+    page_digest = page_digest_for(img)
+
     # 1. Detectar Balões (Regiões brancas grandes)
-    balloons = detect_balloons_contours(img)
-    
-    # Máscara para marcar onde já mexemos (para não processar duas vezes)
-    processed_mask = np.zeros(img.shape[:2], dtype=np.uint8)
-    
+    balloons = detect_balloons_tiled(img, tiles, gray=gray)
+
+    # Erro do Tesseract sobe para quem chamou: a página fica como falha no job,
+    # não como pronta sem texto
+    words = page_words(img, tiles, ocr_lang, page_digest, gray)
+
+    # Balões já processados (para não processar duas vezes)
+    processed = []
+
     # --- FASE 1: Balões (Fundo Branco) ---
-    for (x, y, w, h) in balloons:
-        crop = img[y:y+h, x:x+w]
-        translated = extract_and_translate(crop, ocr_lang, translator_func)
-        if translated:
-            img = remove_text_content(img, x, y, w, h)
-            
-            # Converte para PIL para escrever
-            pil_img = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-            # Outline False = Texto normal em balão branco
-            pil_img = draw_text_in_box(pil_img, (x, y, w, h), translated, font_path, color=(0,0,0), outline=False)
-            img = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-            
-            # Marca área como processada
-            cv2.rectangle(processed_mask, (x, y), (x+w, y+h), 255, -1)
+    if single_pass:
+        balloon_words = {box: [] for box in balloons}
+        loose_words = []
+        for word in words:
+            owner = _balloon_at(balloons, word["cx"], word["cy"])
+            if owner is None:
+                loose_words.append(word)
+            else:
+                balloon_words[owner].append(word)
+
+        for box in balloons:
+            text = _join_words(balloon_words[box])
+            if text:
+                regions.append({"kind": "balloon", "box": box, "text": text})
+    else:
+        for (x, y, w, h) in balloons:
+            crop = img[y:y+h, x:x+w]
+            text = extract_text(crop, ocr_lang, page_digest, (x, y, w, h), gray[y:y+h, x:x+w])
+            if text:
+                regions.append({"kind": "balloon", "box": (x, y, w, h), "text": text})
+
+                # Marca área como processada
+                processed.append((x, y, w, h))
+
+        # Se o centro da palavra cai num balão que JÁ processamos, ignora
+        loose_words = [w for w in words if _balloon_at(processed, w["cx"], w["cy"]) is None]
 
     # --- FASE 2: Texto Solto (Sobre a Arte) ---
-    try:
-        # Pega todos os blocos de texto da imagem inteira
-        data = pytesseract.image_to_data(img, lang=ocr_lang, output_type=pytesseract.Output.DICT)
-        n_boxes = len(data['text'])
-        
-        # Agrupa blocos de texto (Parágrafos/Blocos)
-        blocks = {}
-        for i in range(n_boxes):
+    regions.extend(_loose_regions(loose_words, len(tiles) > 1))
+    return regions
+
+def page_words(img, tiles, ocr_lang, page_digest=None, gray=None):
+    """
+    Palavras da página (uma chamada do Tesseract por faixa), já em coordenadas
+    da página. Cada palavra da sobreposição entre faixas aparece uma vez só.
+    Faixas sem tinta nenhuma (calhas, céu, painéis vazios) são puladas.
+    """
+    gray = page_gray(img) if gray is None else gray
+    words = []
+    for k, (ty0, ty1, core0, core1) in enumerate(tiles):
+        if not worth_ocr(gray[ty0:ty1]):
+            continue
+        data = extract_words(img, ty0, ty1, ocr_lang, page_digest, gray)
+
+        for i in range(len(data['text'])):
             # Confiança > 30 e texto não vazio
-            if int(data['conf'][i]) > 30 and data['text'][i].strip():
-                x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-                
-                # Se o centro desse texto cai num balão que JÁ processamos, ignora
-                cx, cy = x + w//2, y + h//2
-                if processed_mask[cy, cx] != 0:
-                    continue
-                
-                # Chave única para o bloco (BlockNum_ParNum)
-                blk_id = f"{data['block_num'][i]}_{data['par_num'][i]}"
-                if blk_id not in blocks: 
-                    blocks[blk_id] = {'text': [], 'box': [x, y, x+w, y+h]}
-                
-                blocks[blk_id]['text'].append(data['text'][i])
-                
-                # Expande o retângulo do bloco para caber todas as palavras
-                bx = blocks[blk_id]['box']
-                bx[0] = min(bx[0], x)
-                bx[1] = min(bx[1], y)
-                bx[2] = max(bx[2], x+w)
-                bx[3] = max(bx[3], y+h)
-
-        # Processa cada bloco solto encontrado
-        for b in blocks.values():
-            original_text = " ".join(b['text'])
-            x1, y1, x2, y2 = b['box']
-            w, h = x2-x1, y2-y1
-            
-            if w < 20 or h < 10: continue 
-
-            # Traduz
-            try:
-                translated = translator_func(original_text)
-            except:
-                translated = original_text
-            
-            # Apaga o texto original (tentando manter o fundo da arte)
-            img = remove_text_content(img, x1, y1, w, h)
-            
-            pil_img = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-            
+            if int(float(data['conf'][i])) <= 30 or not data['text'][i].strip():
+                continue
+
+            x, y, w, h = data['left'][i], data['top'][i] + ty0, data['width'][i], data['height'][i]
+            cx, cy = x + w//2, y + h//2
+
+            # Palavra da sobreposição: só a faixa "dona" do centro processa
+            if not (core0 <= cy < core1):
+                continue
+
+            words.append({
+                "text": data['text'][i], "box": (x, y, w, h), "cx": cx, "cy": cy, "tile": k,
+                # Chave única para o bloco (BlockNum_ParNum) e para a linha
+                "block": f"{data['block_num'][i]}_{data['par_num'][i]}",
+                "line": (data['block_num'][i], data['par_num'][i], data['line_num'][i]),
+            })
+    return words
+
+def _balloon_at(balloons, cx, cy):
+    for box in balloons:
+        bx, by, bw, bh = box
+        if bx <= cx <= bx + bw and by <= cy <= by + bh:
+            return box
+    return None
+
+def _join_words(words):
+    """Texto de um balão: linhas de cima para baixo, palavras da esquerda para a direita."""
+    lines = {}
+    for w in words:
+        lines.setdefault((w["tile"], w["line"]), []).append(w)
+
+    ordered = sorted(lines.values(), key=lambda ws: min(w["box"][1] for w in ws))
+    return "\n".join(
+        " ".join(w["text"] for w in sorted(ws, key=lambda w: w["box"][0]))
+        for ws in ordered
+    )
+
+def _loose_regions(words, tiled):
+    """Agrupa as palavras soltas em blocos (parágrafos do Tesseract)."""
+    blocks = {}
+    for word in words:
+        x, y, w, h = word["box"]
+        key = (word["tile"], word["block"])
+        if key not in blocks:
+            blocks[key] = {'text': [], 'box': [x, y, x+w, y+h], 'tile': word["tile"]}
+
+        blocks[key]['text'].append(word["text"])
+
+        # Expande o retângulo do bloco para caber todas as palavras
+        bx = blocks[key]['box']
+        bx[0] = min(bx[0], x)
+        bx[1] = min(bx[1], y)
+        bx[2] = max(bx[2], x+w)
+        bx[3] = max(bx[3], y+h)
+
+    blocks = list(blocks.values())
+    if tiled:
+        blocks = _merge_seam_blocks(blocks)
+
+    regions = []
+    for b in blocks:
+        x1, y1, x2, y2 = b['box']
+        w, h = x2-x1, y2-y1
+
+        if w < 20 or h < 10: continue
+
+        regions.append({"kind": "loose", "box": (x1, y1, w, h), "text": " ".join(b['text'])})
+    return regions
+
+def render_page_regions(img, regions, translations, font_path=None, page_cleanup=None, gray=None):
+    """
+    Apaga o texto original de cada região e desenha a tradução correspondente.
+
+    page_cleanup (padrão: PAGE_TEXT_CLEANUP): apaga todas as regiões de uma vez
+    com clean_text_regions antes de desenhar; sem ele, remove_text_content roda
+    região por região. gray: page_gray da página original, se já calculado.
+    """
+    page_cleanup = PAGE_TEXT_CLEANUP if page_cleanup is None else page_cleanup
+
+    jobs = []
+    for region, translated in zip(regions, translations):
+        x, y, w, h = region["box"]
+
+        if region["kind"] == "balloon":
+            if not translated:
+                continue
+            # Outline False = Texto normal em balão branco
+            jobs.append(((x, y, w, h), (x, y, w, h), translated, False))
+        else:
             # Aumenta um pouco a área de desenho (padding)
-            draw_box = (max(0, x1-10), max(0, y1-5), w+20, h+10)
-            
+            draw_box = (max(0, x-10), max(0, y-5), w+20, h+10)
+
             # Outline True = Texto com borda branca (estilo legenda/pensamento)
-            pil_img = draw_text_in_box(pil_img, draw_box, translated, font_path, color=(0,0,0), outline=True)
-            img = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+            jobs.append(((x, y, w, h), draw_box, translated, True))
 
-    except Exception as e:
-        print(f"Erro no processamento de texto solto: {e}")
+    if page_cleanup:
+        img = clean_text_regions(img, [box for box, _, _, _ in jobs], gray=gray)
+
+    for box, draw_box, translated, outline in jobs:
+        if not page_cleanup:
+            # Apaga o texto original (tentando manter o fundo da arte)
+            img = remove_text_content(img, *box)
+        img = draw_text_in_region(img, draw_box, translated, font_path, color=(0,0,0), outline=outline)
+
+    return img
+
+def process_image_file(image_path, ocr_lang, translator_func, font_path=None, save_out=True,
+                       batch_translator_func=None, workspace=None, manifest=None):
+    """
+    Processa uma página em três etapas:
+        1. OCR de todos os balões e blocos de texto solto
+        2. Tradução de todos os textos da página em um único lote
+        3. Remoção do texto original e desenho das traduções
 
-    # Salvar resultado
-    out_path = image_path.replace(TEMP_FOLDER, TEMP_OUT)
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    cv2.imwrite(out_path, img)
-    return out_path
\ No newline at end of file
+    image_path pode ser um caminho ou um Page (página em memória).
+
+    manifest (JobManifest): reaproveita o OCR e as traduções de uma execução
+    anterior, registra cada etapa e guarda a página pronta no job.
+    """
+    name = os.path.basename(image_path.path if isinstance(image_path, Page) else image_path)
+    if manifest is not None:
+        manifest.record_source(name, image_path)
+
+    img = load_page_image(image_path)
+    if img is None: return None
+
+    gray = page_gray(img)
+    regions = manifest.cached_regions(name) if manifest is not None else None
+    if regions is None:
+        regions = ocr_page_regions(img, ocr_lang, gray=gray)
+        if manifest is not None:
+            manifest.record_regions(name, regions)
+
+    translations = manifest.cached_translations(name) if manifest is not None else None
+    if translations is None:
+        texts = [r["text"] for r in regions]
+        translations = translate_texts(texts, translator_func, batch_translator_func)
+        if manifest is not None:
+            manifest.record_translations(name, texts, translations)
+
+    img = render_page_regions(img, regions, translations, font_path, gray=gray)
+    out = save_page_output(image_path, img, workspace, changed=bool(regions))
+    if manifest is not None:
+        manifest.store_output(name, out)
+    return out
+
+def load_page_image(source, stage="ocr"):
+    """Array BGR da página, vindo de um caminho ou de um Page em memória."""
+    if isinstance(source, Page):
+        return source.decode(stage)
+    return read_image(source, stage)
+
+def save_page_output(image_path, img, workspace=None, changed=True):
+    """
+    Salva a página traduzida (mesmo nome da original) no workspace ou em TEMP_OUT.
+
+    Page em memória: o resultado fica no próprio Page (nada vai para o disco,
+    exceto a cópia de depuração com SAVE_DEBUG_PAGES). Sem texto desenhado
+    (changed=False), o PDF usa os bytes originais.
+    """
+    if isinstance(image_path, Page):
+        if changed:
+            image_path.set_rendered(img)
+        if SAVE_DEBUG_PAGES and workspace is not None:
+            write_image(workspace.output_path_for(image_path.path), img, "debug")
+        return image_path
+
+    if workspace is not None:
+        out_path = workspace.output_path_for(image_path)
+    else:
+        out_path = image_path.replace(TEMP_FOLDER, TEMP_OUT)
+    return write_image(out_path, img, "render")
+
+# ------------------------------------------------------------
+# Tarefas para o pool de processos
+# (funções de topo de módulo → podem ser serializadas pelo multiprocessing)
+# ------------------------------------------------------------
+def _task_snapshot():
+    cache = get_ocr_cache(ocr_version())
+    return IO_STATS.snapshot(), OCR_STATS.snapshot(), cache.counters() if cache else None
+
+def _task_stats(before):
+    """Contadores do filho desde _task_snapshot (I/O, OCR e cache de OCR), para o pai somar."""
+    io_before, ocr_before, cache_before = before
+    cache = get_ocr_cache(ocr_version())
+    cache_diff = {}
+    if cache is not None and cache_before is not None:
+        cache_diff = {key: value - cache_before[key] for key, value in cache.counters().items()}
+    return {"io": IO_STATS.since(io_before), "ocr": OCR_STATS.since(ocr_before), "cache": cache_diff}
+
+def merge_task_stats(stats):
+    """No processo pai: soma os contadores devolvidos por ocr_page_task/render_page_task."""
+    IO_STATS.merge(stats.get("io", {}))
+    OCR_STATS.merge(stats.get("ocr", {}))
+    cache = get_ocr_cache(ocr_version())
+    if cache is not None and stats.get("cache"):
+        cache.merge(stats["cache"])
+
+def ocr_page_task(image_path, ocr_lang):
+    """
+    Lê a página e retorna apenas as regiões com texto (leve para voltar ao processo pai),
+    junto com os contadores do filho (ver merge_task_stats).
+    """
+    before = _task_snapshot()
+    img = read_image(image_path, "ocr")
+    regions = ocr_page_regions(img, ocr_lang) if img is not None else None
+    return regions, _task_stats(before)
+
+def render_page_task(image_path, regions, translations, font_path=None, workspace=None):
+    """
+    Relê a página, desenha as traduções vindas do processo pai e salva na pasta de saída.
+    Também retorna os contadores do filho (ver merge_task_stats).
+    """
+    before = _task_snapshot()
+    img = read_image(image_path, "render")
+    if img is None: return None, _task_stats(before)
+    img = render_page_regions(img, regions, translations, font_path)
+    return save_page_output(image_path, img, workspace), _task_stats(before)
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+
+def image_digest(img):
+    """Hash do conteúdo (pixels + formato) de um array de imagem."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(str((img.shape, str(img.dtype))).encode())
+    h.update(memoryview(img if img.flags["C_CONTIGUOUS"] else img.copy()))
+    return h.hexdigest()
+
+
+def ocr_cache_key(page_digest, roi, ocr_lang, tess_config):
+    """Chave: (hash da página, recorte (x, y, w, h), idioma, configuração do Tesseract)."""
+    return hashlib.blake2b(
+        f"{page_digest}|{tuple(int(v) for v in roi)}|{ocr_lang}|{tess_config}".encode(),
+        digest_size=20
+    ).hexdigest()
+
+
+class OCRCache:
+    """
+    Cache em disco (SQLite) dos resultados do Tesseract: texto reconhecido e
+    caixas das palavras, guardados em JSON.
+
+    - Tamanho limitado a max_bytes: acima disso remove os menos usados.
+    - version identifica o pré-processamento + versão do Tesseract. Entradas de
+      outra versão são apagadas ao abrir (mudou o pré-processamento → OCR refeito).
+    - Vários processos podem usar o mesmo arquivo (pool de páginas): o SQLite
+      faz o controle de acesso.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, version=""):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS ocr (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS ocr_last_used ON ocr(last_used)")
+        stale = self._db.execute("DELETE FROM ocr WHERE version != ?", (version,)).rowcount
+        self._db.commit()
+        if stale > 0:
+            print(f"🧹 Cache de OCR: {stale} resultados de outra versão do pré-processamento removidos")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+
+    # ------------------------------------------------------------
+    # Consulta / gravação
+    # ------------------------------------------------------------
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM ocr WHERE key=?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._db.execute("UPDATE ocr SET last_used=? WHERE key=?", (time.time(), key))
+            self._db.commit()
+            return json.loads(row[0])
+
+    def put(self, key, value):
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM ocr WHERE key=?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO ocr (key, version, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, self.version, data, len(data), time.time())
+            )
+            self._db.commit()
+            self._size += len(data) - (old[0] if old else 0)
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Outros processos também gravam → recalcula o total antes de apagar
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM ocr ORDER BY last_used"):
+            if self._size - freed <= target:
+                break
+            victims.append((key,))
+            freed += size
+
+        self._db.executemany("DELETE FROM ocr WHERE key=?", victims)
+        self._db.commit()
+        self.evictions += len(victims)
+        self._size -= freed
+
+    def counters(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def merge(self, diff):
+        """Soma os contadores (diferença de counters) de outro processo, ex.: filhos do pool."""
+        with self._lock:
+            self.hits += diff.get("hits", 0)
+            self.misses += diff.get("misses", 0)
+            self.evictions += diff.get("evictions", 0)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self._size,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ------------------------------------------------------------
+# Instância compartilhada (uma por processo)
+# ------------------------------------------------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache(version):
+    global _cache
+    if not config.OCR_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None or _cache.version != version:
+            _cache = OCRCache(
+                config.OCR_CACHE_PATH,
+                max_bytes=int(config.OCR_CACHE_MAX_MB * 1024 * 1024),
+                version=version,
+            )
+        return _cache
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+# -------------------------------------------------------------
+# 📊 Contadores de codificação/decodificação por etapa
+# -------------------------------------------------------------
+class IOStats:
+    """
+    Conta quantas vezes cada etapa codificou/decodificou imagens e quanto tempo gastou.
+    Chave: (etapa, operação), ex.: ("ocr", "decode"), ("render", "encode"), ("pdf", "passthrough").
+    """
+
+    def __init__(self):
+        self._counts = defaultdict(int)
+        self._seconds = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, stage, op, seconds=0.0):
+        with self._lock:
+            self._counts[(stage, op)] += 1
+            self._seconds[(stage, op)] += seconds
+
+    @contextmanager
+    def timed(self, stage, op):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, op, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: (self._counts[key], self._seconds[key]) for key in self._counts}
+
+    def since(self, before):
+        """Diferença entre agora e um snapshot anterior (só o que mudou)."""
+        diff = {}
+        for key, (count, seconds) in self.snapshot().items():
+            old_count, old_seconds = before.get(key, (0, 0.0))
+            if count > old_count:
+                diff[key] = (count - old_count, seconds - old_seconds)
+        return diff
+
+    def merge(self, diff):
+        """Soma uma diferença (since) vinda de outro processo, ex.: filhos do pool."""
+        with self._lock:
+            for key, (count, seconds) in diff.items():
+                self._counts[key] += count
+                self._seconds[key] += seconds
+
+    @staticmethod
+    def format(stats):
+        if not stats:
+            return "nenhuma"
+        return " • ".join(
+            f"{stage} {op} {count}× {seconds:.2f}s"
+            for (stage, op), (count, seconds) in sorted(stats.items())
+        )
+
+
+IO_STATS = IOStats()
+
+
+def read_image(path, stage):
+    """cv2.imread contado como decodificação da etapa."""
+    with IO_STATS.timed(stage, "decode"):
+        return cv2.imread(path)
+
+
+def write_image(path, img, stage):
+    """cv2.imwrite contado como codificação da etapa."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with IO_STATS.timed(stage, "encode"):
+        cv2.imwrite(path, img)
+    return path
+
+
+# -------------------------------------------------------------
+# 📄 Página em memória
+# -------------------------------------------------------------
+class Page:
+    """
+    Página que passa de etapa em etapa sem ir para o disco.
+
+    data:     bytes originais do arquivo baixado (JPEG/PNG/WebP, sem recodificar)
+    path:     caminho "virtual" (define o nome da página; o arquivo não precisa existir)
+    rendered: página traduzida (array BGR), ou None se nada foi desenhado nela
+
+    O PDF recebe os bytes originais quando a página não mudou (JPEG vai direto,
+    sem decodificar) ou o array desenhado convertido para PIL (sem PNG no meio).
+    """
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self.rendered = None
+
+    @classmethod
+    def from_file(cls, path, name=None):
+        """Lê os bytes de um arquivo local (sem decodificar)."""
+        with open(path, "rb") as f:
+            return cls(name or path, f.read())
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def __repr__(self):
+        return f"Page({self.name!r})"
+
+    def __lt__(self, other):
+        return self.path < other.path
+
+    def decode(self, stage="ocr"):
+        """Decodifica os bytes originais em um array BGR (como cv2.imread)."""
+        with IO_STATS.timed(stage, "decode"):
+            return cv2.imdecode(np.frombuffer(self.data, np.uint8), cv2.IMREAD_COLOR)
+
+    def set_rendered(self, img):
+        self.rendered = img
+
+    def pdf_source(self):
+        """O que o StreamingPdfWriter deve receber para esta página."""
+        if self.rendered is None:
+            return self.data
+        return Image.fromarray(cv2.cvtColor(self.rendered, cv2.COLOR_BGR2RGB))
+
+    def release(self):
+        """Libera a memória da página depois que ela entrou no PDF."""
+        self.data = None
+        self.rendered = None
@@ -0,0 +1,170 @@
+import json
+import re
+import time
+from html.parser import HTMLParser
+import posixpath
+from urllib.parse import urljoin, urlsplit
+
+import config
+from http_fetch import get_session
+
+# -------------------------------------------------------------
+# ⚡ Caminho rápido sem navegador
+# Baixa o HTML do capítulo com HTTP simples e tenta achar as URLs das
+# páginas direto no HTML ou em JSON embutido. Cada extrator recebe
+# (html, base_url) e retorna uma lista de URLs na ordem do capítulo.
+# -------------------------------------------------------------
+
+IMAGE_EXT = re.compile(r"\.(jpe?g|png|webp|gif|avif)(\?|#|$)", re.IGNORECASE)
+
+# Imagens do site (não do capítulo)
+NOISE = re.compile(r"(logo|avatar|icon|banner|sprite|emoji|favicon|thumb|ads?[/_-])", re.IGNORECASE)
+
+LAZY_ATTRS = ("data-src", "data-lazy-src", "data-original", "data-url", "src")
+
+
+class _ImgParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.images = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "img":
+            return
+        attrs = dict(attrs)
+
+        src = ""
+        for name in LAZY_ATTRS:
+            value = (attrs.get(name) or "").strip()
+            if value and not value.startswith("data:"):
+                src = value
+                break
+
+        if not src:
+            srcset = attrs.get("srcset") or attrs.get("data-srcset") or ""
+            src = _largest_from_srcset(srcset)
+
+        if src:
+            self.images.append(src)
+
+
+def _largest_from_srcset(srcset):
+    best, best_w = "", -1
+    for part in srcset.split(","):
+        bits = part.strip().split()
+        if not bits:
+            continue
+        width = 0
+        if len(bits) > 1 and bits[1][:-1].replace(".", "", 1).isdigit():
+            width = float(bits[1][:-1])
+        if width > best_w:
+            best, best_w = bits[0], width
+    return best
+
+
+def _clean(urls, base_url):
+    seen = set()
+    out = []
+    for u in urls:
+        u = urljoin(base_url, u.strip())
+        if not u.startswith("http") or u in seen:
+            continue
+        if not IMAGE_EXT.search(u) or NOISE.search(u):
+            continue
+        seen.add(u)
+        out.append(u)
+    return out
+
+
+def extract_img_tags(html, base_url):
+    """<img> com src / data-src / data-lazy-src / srcset."""
+    parser = _ImgParser()
+    parser.feed(html)
+    return _clean(parser.images, base_url)
+
+
+# Padrões de leitores comuns (WordPress Madara/MangaReader, ts_reader, listas "images": [...])
+_JSON_PATTERNS = [
+    re.compile(r"ts_reader\.run\((\{.*?\})\);", re.DOTALL),
+    re.compile(r"(?:chapter_?images|chapterImages|pages|images)\s*[=:]\s*(\[[^\]]*\])", re.IGNORECASE),
+    re.compile(r'<script[^>]+type="application/(?:ld\+)?json"[^>]*>(.*?)</script>', re.DOTALL),
+]
+
+
+def _walk_json(obj, found):
+    if isinstance(obj, str):
+        found.append(obj)
+    elif isinstance(obj, list):
+        for item in obj:
+            _walk_json(item, found)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _walk_json(value, found)
+
+
+def extract_reader_json(html, base_url):
+    """URLs de imagem dentro de JSON embutido (ts_reader.run, chapterImages = [...], ld+json)."""
+    best = []
+    for pattern in _JSON_PATTERNS:
+        for match in pattern.finditer(html):
+            blob = match.group(1).replace("\\/", "/")
+            try:
+                found = []
+                _walk_json(json.loads(blob), found)
+            except ValueError:
+                found = re.findall(r'"([^"]+)"', blob)
+            urls = _clean(found, base_url)
+            # Fica com o maior grupo: é o capítulo, não miniaturas soltas
+            if len(urls) > len(best):
+                best = urls
+    return best
+
+
+def chapter_group(urls):
+    """
+    Maior grupo de URLs no mesmo servidor e na mesma pasta, na ordem original.
+    As páginas de um capítulo ficam juntas (cdn/capitulo-12/001.jpg, 002.jpg...);
+    capas, anúncios e imagens do tema vêm de outras pastas e ficam de fora.
+    """
+    groups = {}
+    for u in urls:
+        parts = urlsplit(u)
+        groups.setdefault((parts.netloc, posixpath.dirname(parts.path)), []).append(u)
+    return max(groups.values(), key=len, default=[])
+
+
+EXTRACTORS = [
+    ("reader_json", extract_reader_json),
+    ("img_tags", extract_img_tags),
+]
+
+
+def fast_extract(url, session=None, min_images=None, extractors=None):
+    """
+    Tenta achar as imagens do capítulo sem abrir o Chrome.
+    Retorna (urls, nome_do_extrator, segundos). urls vazia se nenhum extrator
+    achou pelo menos min_images imagens no mesmo servidor e pasta (chapter_group).
+    """
+    session = session or get_session()
+    min_images = config.FAST_PATH_MIN_IMAGES if min_images is None else min_images
+    extractors = extractors or EXTRACTORS
+    start = time.time()
+
+    try:
+        r = session.get(url, timeout=(config.DOWNLOAD_CONNECT_TIMEOUT, config.DOWNLOAD_READ_TIMEOUT))
+        r.raise_for_status()
+        html = r.text
+    except Exception as e:
+        print(f"⚠️ Caminho rápido: não foi possível baixar o HTML ({e})")
+        return [], None, time.time() - start
+
+    for name, extractor in extractors:
+        try:
+            urls = chapter_group(extractor(html, r.url))
+        except Exception as e:
+            print(f"⚠️ Extrator {name} falhou: {e}")
+            continue
+        if len(urls) >= min_images:
+            return urls, name, time.time() - start
+
+    return [], None, time.time() - start
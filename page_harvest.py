@@ -0,0 +1,152 @@
+import time
+
+import config
+
+# -------------------------------------------------------------
+# 🛰️ Observador injetado na página
+# Marca o instante da última mudança relevante: nós/atributos de <img>
+# alterados, imagem terminando de carregar ou novo recurso de rede.
+# -------------------------------------------------------------
+INSTALL_OBSERVER_JS = """
+if (!window.__harvest) {
+    var h = window.__harvest = {lastChange: Date.now(), nextId: 1, resources: 0};
+    var touch = function () { h.lastChange = Date.now(); };
+
+    new MutationObserver(touch).observe(document.documentElement, {
+        subtree: true, childList: true, attributes: true,
+        attributeFilter: ['src', 'srcset', 'data-src', 'data-lazy-src', 'data-original']
+    });
+    document.addEventListener('load', function (e) {
+        if (e.target && e.target.tagName === 'IMG') touch();
+    }, true);
+    document.addEventListener('error', function (e) {
+        if (e.target && e.target.tagName === 'IMG') touch();
+    }, true);
+}
+"""
+
+# Estado atual: imagens (com id estável), altura da página e tempo sem mudanças.
+# Se a página navegou depois da instalação (tela do Cloudflare, redirecionamento
+# por JS), o observador some junto: reinstala e avisa com fresh=true
+POLL_JS = """
+var fresh = !window.__harvest;
+""" + INSTALL_OBSERVER_JS + """
+var h = window.__harvest;
+var res = performance.getEntriesByType('resource').length;
+if (res !== h.resources) { h.resources = res; h.lastChange = Date.now(); }
+
+var viewTop = window.scrollY, viewBottom = viewTop + window.innerHeight;
+var imgs = [], pendingInView = 0;
+
+document.querySelectorAll('img').forEach(function (img) {
+    if (!img.__hid) img.__hid = h.nextId++;
+
+    var src = img.currentSrc || img.src || '';
+    if (!src || src.indexOf('data:') === 0) {
+        var lazy = img.getAttribute('data-src') || img.getAttribute('data-lazy-src')
+                || img.getAttribute('data-original');
+        if (lazy) src = new URL(lazy, document.baseURI).href;
+    }
+
+    var r = img.getBoundingClientRect();
+    var top = r.top + viewTop;
+    var loaded = img.complete && img.naturalWidth > 0;
+    if (!img.complete && top < viewBottom && top + r.height > viewTop) pendingInView++;
+
+    imgs.push({id: img.__hid, el: img, src: src, y: top,
+               w: r.width, h: r.height, loaded: loaded});
+});
+
+return {images: imgs, pendingInView: pendingInView,
+        height: document.body.scrollHeight, viewport: window.innerHeight,
+        quietMs: Date.now() - h.lastChange, fresh: fresh};
+"""
+
+
+def _wait_ready(driver, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if driver.execute_script("return document.readyState") != "loading":
+                return
+        except Exception:
+            pass
+        time.sleep(0.05)
+
+
+def _settle(driver, quiet_ms, timeout, poll=0.1):
+    """
+    Espera até as imagens visíveis terminarem de carregar e o DOM/rede
+    ficarem quietos por quiet_ms (ou até o timeout). Retorna o último estado;
+    state["fresh"] fica True se a página navegou durante a espera.
+    """
+    deadline = time.time() + timeout
+    fresh = False
+    while True:
+        state = driver.execute_script(POLL_JS)
+        fresh = fresh or state["fresh"]
+        if (state["pendingInView"] == 0 and state["quietMs"] >= quiet_ms) or time.time() >= deadline:
+            state["fresh"] = fresh
+            return state
+        time.sleep(poll)
+
+
+def harvest_image_candidates(driver, url, min_size=200, quiet_ms=None, step_timeout=None, timeout=None):
+    """
+    Abre a página e coleta as imagens do capítulo enquanto rola a tela.
+
+    Em vez de esperas fixas:
+        - espera as imagens da tela atual carregarem (img.complete/naturalWidth)
+          e a página ficar sem mudanças por quiet_ms (MutationObserver + rede)
+        - coleta as URLs a cada passo (imagens que o leitor remove da tela não se perdem)
+        - para assim que chega ao fim e o conjunto de imagens não muda mais
+
+    Retorna [{"el", "src", "y"}] ordenado pela posição vertical.
+    """
+    quiet_ms = config.HARVEST_QUIET_MS if quiet_ms is None else quiet_ms
+    step_timeout = config.HARVEST_STEP_TIMEOUT if step_timeout is None else step_timeout
+    timeout = config.HARVEST_TIMEOUT if timeout is None else timeout
+
+    start = time.time()
+    driver.get(url)
+    _wait_ready(driver, step_timeout)
+    driver.execute_script(INSTALL_OBSERVER_JS)
+
+    found = {}
+    scroll_y = 0
+    last_signature = None
+
+    while True:
+        driver.execute_script("window.scrollTo(0, arguments[0]);", scroll_y)
+        state = _settle(driver, quiet_ms, step_timeout)
+        if state["fresh"]:
+            # Página nova: os elementos coletados antes não existem mais
+            found.clear()
+            last_signature = None
+            if scroll_y:
+                scroll_y = 0
+                continue
+
+        for img in state["images"]:
+            if img["w"] >= min_size and img["h"] >= min_size and img["src"]:
+                # Atualiza sempre: o src muda quando o placeholder é trocado pela imagem real
+                found[img["id"]] = {"el": img["el"], "src": img["src"], "y": img["y"]}
+
+        at_bottom = scroll_y + state["viewport"] >= state["height"]
+        signature = (len(found), state["height"])
+
+        if at_bottom:
+            # Conjunto estável: nada novo desde a última olhada no fim da página
+            if signature == last_signature:
+                break
+            last_signature = signature
+        else:
+            scroll_y += max(1, int(state["viewport"] * 0.9))
+
+        if time.time() - start > timeout:
+            print("⚠️ Tempo limite ao coletar imagens, seguindo com o que foi encontrado")
+            break
+
+    candidates = sorted(found.values(), key=lambda c: c["y"])
+    print(f"🔎 {len(candidates)} imagens coletadas em {time.time() - start:.1f}s")
+    return candidates
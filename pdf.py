@@ -1,43 +1,222 @@
-
+import io
+import os
+import shutil
+import zlib
 
 from PIL import Image
 
-def generate_pdf(image_paths, pdf_path):
-    if not image_paths:
-        raise ValueError("Nenhuma imagem fornecida para gerar PDF.")
+from page_buffer import IO_STATS
 
-    pil_imgs = []
-    
-    for path in image_paths:
-        try:
-            img = Image.open(path)
+# Linhas por faixa ao comprimir páginas decodificadas (limita a memória em tiras altas)
+BAND_ROWS = 256
 
-            # Converter sempre para RGB (evita problemas com PNG e transparência)
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
 
-            pil_imgs.append(img)
+class StreamingPdfWriter:
+    """
+    Escreve o PDF uma página por vez, direto no arquivo.
+    Só a página atual fica na memória; no fim grava a árvore de páginas e o xref.
 
-        except Exception as e:
-            print(f"❌ Erro ao abrir a imagem {path}: {e}")
+    - JPEG RGB/cinza: os bytes do arquivo vão direto para o PDF (DCTDecode, sem recodificar)
+    - Outros formatos: pixels RGB/cinza comprimidos com zlib (FlateDecode), sem perda
 
-    if not pil_imgs:
-        raise ValueError("Falha ao carregar imagens para o PDF.")
+    O tamanho de cada página em pontos = tamanho em pixels (72 dpi), como no save_all do PIL.
+    """
 
-    # Garantir que o primeiro exista
-    first = pil_imgs[0]
-    rest = pil_imgs[1:]
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        self.f = open(pdf_path, "wb")
+        self.offsets = {}
+        self.page_ids = []
+        # 1 = Catalog, 2 = Pages (gravados no close)
+        self.next_id = 3
 
-    try:
-        first.save(
-            pdf_path,
-            save_all=True,
-            append_images=rest
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.f.close()
+
+    @property
+    def page_count(self):
+        return len(self.page_ids)
+
+    # ------------------------------------------------------------
+    # Objetos PDF
+    # ------------------------------------------------------------
+    def _alloc(self):
+        num = self.next_id
+        self.next_id += 1
+        return num
+
+    def _write_obj(self, num, body):
+        self.offsets[num] = self.f.tell()
+        self.f.write(f"{num} 0 obj\n".encode())
+        self.f.write(body if isinstance(body, bytes) else body.encode())
+        self.f.write(b"\nendobj\n")
+
+    def _write_stream(self, num, header, chunks):
+        """Grava um stream cujo tamanho só é conhecido no fim (/Length indireto)."""
+        length_id = self._alloc()
+        self.offsets[num] = self.f.tell()
+        self.f.write(f"{num} 0 obj\n<< {header} /Length {length_id} 0 R >>\nstream\n".encode())
+
+        start = self.f.tell()
+        for chunk in chunks:
+            self.f.write(chunk)
+        length = self.f.tell() - start
+
+        self.f.write(b"\nendstream\nendobj\n")
+        self._write_obj(length_id, str(length))
+
+    # ------------------------------------------------------------
+    # Páginas
+    # ------------------------------------------------------------
+    def add_page(self, source):
+        """
+        Adiciona uma página a partir de um caminho de imagem, dos bytes do arquivo,
+        de uma PIL.Image ou de um Page em memória (page_buffer).
+        """
+        if hasattr(source, "pdf_source"):
+            source = source.pdf_source()
+
+        if isinstance(source, Image.Image):
+            self._add_decoded(source)
+            return
+
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+
+        with Image.open(source) as img:
+            if img.format == "JPEG" and img.mode in ("RGB", "L"):
+                IO_STATS.record("pdf", "passthrough")
+                self._add_jpeg(source, img.size, img.mode)
+            else:
+                with IO_STATS.timed("pdf", "decode"):
+                    img.load()
+                self._add_decoded(img)
+
+    def _add_jpeg(self, source, size, mode):
+        w, h = size
+        colorspace = "/DeviceRGB" if mode == "RGB" else "/DeviceGray"
+
+        def chunks():
+            if isinstance(source, io.BytesIO):
+                yield source.getvalue()
+                return
+            with open(source, "rb") as src:
+                while True:
+                    data = src.read(1 << 20)
+                    if not data:
+                        return
+                    yield data
+
+        image_id = self._alloc()
+        self._write_stream(
+            image_id,
+            f"/Type /XObject /Subtype /Image /Width {w} /Height {h} "
+            f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode",
+            chunks()
         )
-        print(f"✅ PDF gerado com sucesso: {pdf_path}")
+        self._add_page_for_image(image_id, w, h)
+
+    def _add_decoded(self, img):
+        # Converter sempre para RGB (evita problemas com PNG e transparência)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        # Decodifica antes de abrir o stream: um arquivo corrompido falha aqui, sem sujar o PDF
+        img.load()
+        w, h = img.size
+        colorspace = "/DeviceRGB" if img.mode == "RGB" else "/DeviceGray"
+
+        def chunks():
+            comp = zlib.compressobj(6)
+            for y in range(0, h, BAND_ROWS):
+                band = img.crop((0, y, w, min(h, y + BAND_ROWS)))
+                data = comp.compress(band.tobytes())
+                if data:
+                    yield data
+            yield comp.flush()
+
+        image_id = self._alloc()
+        self._write_stream(
+            image_id,
+            f"/Type /XObject /Subtype /Image /Width {w} /Height {h} "
+            f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /FlateDecode",
+            chunks()
+        )
+        self._add_page_for_image(image_id, w, h)
+
+    def _add_page_for_image(self, image_id, w, h):
+        content = f"q {w} 0 0 {h} 0 0 cm /Im0 Do Q".encode()
+        content_id = self._alloc()
+        self._write_obj(content_id, f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream")
+
+        page_id = self._alloc()
+        self._write_obj(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {w} {h}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        self.page_ids.append(page_id)
+
+    # ------------------------------------------------------------
+    # Finalização
+    # ------------------------------------------------------------
+    def close(self):
+        if self.f.closed:
+            return
+
+        kids = " ".join(f"{p} 0 R" for p in self.page_ids)
+        self._write_obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self._write_obj(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_pos = self.f.tell()
+        size = self.next_id
+        self.f.write(f"xref\n0 {size}\n".encode())
+        self.f.write(b"0000000000 65535 f \n")
+        for num in range(1, size):
+            self.f.write(f"{self.offsets[num]:010d} 00000 n \n".encode())
+        self.f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n".encode())
+        self.f.close()
+
+
+def generate_pdf(image_paths, pdf_path, workspace=None):
+    """
+    Gera o PDF na ordem de image_paths.
+    Com workspace, o arquivo é montado dentro da pasta da execução e só vai
+    para pdf_path quando está completo (nunca fica um PDF pela metade na saída).
+    """
+    if not image_paths:
+        raise ValueError("Nenhuma imagem fornecida para gerar PDF.")
+
+    final_path = pdf_path
+    if workspace is not None:
+        pdf_path = os.path.join(workspace.root, os.path.basename(final_path) + ".part")
+
+    try:
+        with StreamingPdfWriter(pdf_path) as writer:
+            for path in image_paths:
+                try:
+                    writer.add_page(path)
+                except Exception as e:
+                    print(f"❌ Erro ao abrir a imagem {path}: {e}")
+
+            if writer.page_count == 0:
+                raise ValueError("Falha ao carregar imagens para o PDF.")
+
+        if pdf_path != final_path:
+            shutil.move(pdf_path, final_path)
+        print(f"✅ PDF gerado com sucesso: {final_path}")
+    except ValueError:
+        # Evita deixar um PDF vazio/corrompido para trás
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        raise
     except Exception as e:
         print(f"❌ Erro ao gerar PDF: {e}")
-    finally:
-        # Evita arquivo corrompido por imagens abertas
-        for img in pil_imgs:
-            img.close()
\ No newline at end of file
@@ -9,6 +9,10 @@ import math
 # Windows Acrylic / Blur (Mica/Acrylic)
 # -------------------------------------------
 def enable_blur_effect(hwnd):
+    # Só existe no Windows (no Linux/macOS a janela fica sem o blur)
+    if not hasattr(ctypes, "windll"):
+        return
+
     ACCENT_POLICY = 19
     class ACCENT(ctypes.Structure):
         _fields_ = [
@@ -46,9 +50,10 @@ class ProgressWindow:
         self.root.attributes("-alpha", 0.96)
         self.root.configure(bg="#F0F0F0")
 
-        # Aplicar blur
-        hwnd = ctypes.windll.user32.GetParent(self.root.winfo_id())
-        enable_blur_effect(hwnd)
+        # Aplicar blur (apenas Windows)
+        if hasattr(ctypes, "windll"):
+            hwnd = ctypes.windll.user32.GetParent(self.root.winfo_id())
+            enable_blur_effect(hwnd)
 
         # Centralizar
         self.root.update_idletasks()
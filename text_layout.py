@@ -0,0 +1,125 @@
+from functools import lru_cache
+
+from PIL import ImageFont
+
+# Espaço entre linhas e folga interna do box (mesmos valores do draw_text_in_box original)
+LINE_SPACING = 4
+BOX_PADDING = 4
+MIN_FONT_SIZE = 9
+
+
+# ------------------------------------------------------------
+# Cache de fontes: (caminho, tamanho) → FreeTypeFont
+# ------------------------------------------------------------
+@lru_cache(maxsize=256)
+def get_font(font_path, size):
+    try:
+        return ImageFont.truetype(font_path, size)
+    except:
+        return ImageFont.load_default()
+
+
+class FontMetrics:
+    """
+    Tabelas de métricas por glifo de uma fonte.
+    A largura de uma linha vira a soma dos avanços de cada caractere
+    (sem chamar textbbox para cada linha candidata).
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self._advance = {}
+        self._vertical = {}
+
+    def advance(self, ch):
+        adv = self._advance.get(ch)
+        if adv is None:
+            adv = self._advance[ch] = self.font.getlength(ch)
+        return adv
+
+    def width(self, text):
+        return sum(self.advance(ch) for ch in text)
+
+    def vertical(self, ch):
+        """(topo, base) do glifo em relação à origem da linha."""
+        v = self._vertical.get(ch)
+        if v is None:
+            bbox = self.font.getbbox(ch)
+            v = self._vertical[ch] = (bbox[1], bbox[3])
+        return v
+
+    def height(self, text):
+        """Altura da tinta da linha (equivale a textbbox[3] - textbbox[1])."""
+        tops, bottoms = [], []
+        for ch in text:
+            if ch.isspace():
+                continue
+            top, bottom = self.vertical(ch)
+            tops.append(top)
+            bottoms.append(bottom)
+        return (max(bottoms) - min(tops)) if tops else 0
+
+
+@lru_cache(maxsize=256)
+def get_metrics(font_path, size):
+    return FontMetrics(get_font(font_path, size))
+
+
+def wrap_lines(metrics, words, max_width):
+    """Quebra de linha gulosa: mesma regra do algoritmo original (linha < max_width)."""
+    space = metrics.advance(" ")
+    lines, widths = [], []
+    current, current_w = "", 0
+
+    for word in words:
+        word_w = metrics.width(word)
+        test_w = current_w + space + word_w if current else word_w
+        if test_w < max_width:
+            current = f"{current} {word}" if current else word
+            current_w = test_w
+        else:
+            lines.append(current)
+            widths.append(current_w)
+            current, current_w = word, word_w
+
+    if current:
+        lines.append(current)
+        widths.append(current_w)
+    return lines, widths
+
+
+def _layout_at(text, w, font_path, size):
+    metrics = get_metrics(font_path, size)
+    lines, widths = wrap_lines(metrics, text.split(), w - BOX_PADDING)
+    heights = [metrics.height(l) for l in lines]
+    total_h = sum(lh + LINE_SPACING for lh in heights)
+    return lines, widths, heights, total_h
+
+
+@lru_cache(maxsize=4096)
+def layout_text(text, w, h, font_path=None):
+    """
+    Escolhe o maior tamanho de fonte em que o texto cabe no box (w x h).
+    Busca binária entre MIN_FONT_SIZE e h*0.4 (chute inicial do algoritmo antigo).
+
+    Retorna (tamanho, linhas, larguras, alturas, altura_total).
+    Memorizado: o mesmo texto no mesmo tamanho de box não é recalculado.
+    """
+    lo, hi = MIN_FONT_SIZE, max(MIN_FONT_SIZE, int(h * 0.4))
+    best = None
+
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        lines, widths, heights, total_h = _layout_at(text, w, font_path, mid)
+        if total_h <= (h - BOX_PADDING):
+            best = (mid, lines, widths, heights, total_h)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+
+    if best is None:
+        # Nem o menor tamanho cabe: usa o mínimo (como o loop original fazia)
+        best = (MIN_FONT_SIZE, *_layout_at(text, w, font_path, MIN_FONT_SIZE))
+
+    size, lines, widths, heights, total_h = best
+    return size, tuple(lines), tuple(widths), tuple(heights), total_h
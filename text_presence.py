@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+# Tamanho de um glifo plausível (px, resolução original da página)
+GLYPH_MIN_HEIGHT = 6
+GLYPH_MAX_HEIGHT = 400
+GLYPH_MIN_AREA = 10
+# Preenchimento do retângulo do glifo (traço fino = pouco, bloco sólido = tudo)
+GLYPH_MIN_FILL = 0.08
+GLYPH_MAX_FILL = 0.9
+# Diferença mínima de brilho entre o glifo e o fundo logo em volta dele
+GLYPH_MIN_CONTRAST = 100
+
+
+def _glyphs(gray, mode):
+    """Componentes com cara de glifo numa polaridade do threshold adaptativo."""
+    h, w = gray.shape[:2]
+    ink = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, mode, 25, 12)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    if n <= 1:
+        return 0
+
+    x, y, cw, ch, area = stats.T
+    # Dentro do recorte, sem encostar na borda e bem menor que ele (não é o próprio balão)
+    inside = (x > 0) & (y > 0) & (x + cw < w) & (y + ch < h) & (cw * ch < 0.5 * w * h)
+    sized = (ch >= GLYPH_MIN_HEIGHT) & (ch <= GLYPH_MAX_HEIGHT) & (cw >= 2) & (area >= GLYPH_MIN_AREA)
+    fill = area / np.maximum(cw * ch, 1)
+    candidate = inside & sized & (fill >= GLYPH_MIN_FILL) & (fill <= GLYPH_MAX_FILL)
+    candidate[0] = False
+    if not candidate.any():
+        return 0
+
+    # Contraste: brilho médio do glifo × do anel de 2 px em volta (bincount por rótulo)
+    values = gray.ravel().astype(np.float64)
+    flat = labels.ravel()
+    count = np.maximum(np.bincount(flat, minlength=n), 1)
+    ink_mean = np.bincount(flat, values, n) / count
+
+    grown = cv2.dilate(labels.astype(np.float32), np.ones((5, 5), np.uint8)).astype(np.int32).ravel()
+    ring = (flat == 0) & (grown > 0)
+    ring_count = np.maximum(np.bincount(grown[ring], minlength=n), 1)
+    ring_mean = np.bincount(grown[ring], values[ring], n) / ring_count
+
+    return int((candidate & (np.abs(ink_mean - ring_mean) >= GLYPH_MIN_CONTRAST)).sum())
+
+
+def text_components(gray):
+    """
+    Quantos componentes conectados do recorte (tons de cinza) parecem glifos.
+
+    Threshold adaptativo nas duas polaridades (texto escuro em fundo claro e
+    texto claro com contorno em fundo escuro): fundos lisos e degradês (céu,
+    painel vazio, calha entre quadros) não geram nada. Componentes que
+    encostam na borda do recorte são ignorados (contorno do balão, arte nos
+    cantos da caixa), assim como os de pouco contraste com o fundo em volta
+    (textura/ruído da arte).
+    """
+    h, w = gray.shape[:2]
+    if h < GLYPH_MIN_HEIGHT or w < 2:
+        return 0
+    return max(_glyphs(gray, cv2.THRESH_BINARY_INV), _glyphs(gray, cv2.THRESH_BINARY))
+
+
+def has_text(gray, min_components=1):
+    """True se o recorte pode ter texto (vale a pena chamar o Tesseract)."""
+    h, w = gray.shape[:2]
+    if h < GLYPH_MIN_HEIGHT or w < 2:
+        return False
+    # Texto escuro (o caso comum) primeiro: quase sempre decide sem a segunda polaridade
+    return _glyphs(gray, cv2.THRESH_BINARY_INV) >= min_components or \
+        _glyphs(gray, cv2.THRESH_BINARY) >= min_components
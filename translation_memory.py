@@ -0,0 +1,223 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import config
+
+# Lixo comum do Tesseract nas bordas do texto (barras, sublinhados, aspas soltas...)
+_EDGE_NOISE = " \t\r\n|_~`'\"“”‘’«»"
+
+
+def normalize_text(text):
+    """
+    Normaliza o texto vindo do OCR para servir de chave da memória:
+        - NFKC (unifica larguras/variações de caracteres CJK)
+        - junta palavras hifenizadas na quebra de linha
+        - colapsa espaços/quebras de linha
+        - remove ruído de OCR nas bordas e padroniza reticências
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    text = re.sub(r"(\w)-\s*\n\s*(\w)", r"\1\2", text)
+    text = re.sub(r"\s+", " ", text)
+    text = text.replace("…", "...")
+    text = re.sub(r"\.{3,}", "...", text)
+    return text.strip(_EDGE_NOISE)
+
+
+def _has_letters(text):
+    return any(ch.isalpha() for ch in text)
+
+
+class TranslationMemory:
+    """
+    Memória de tradução persistente (SQLite) com um LRU em memória na frente.
+    Chave: (motor, idioma origem, idioma destino, texto normalizado).
+    """
+
+    def __init__(self, path, max_entries=200_000, lru_size=4096):
+        self.path = path
+        self.max_entries = max_entries
+        self.lru_size = lru_size
+
+        self.hits = 0
+        self.misses = 0
+        self.lru_hits = 0
+        self.evictions = 0
+
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+
+        # Usado pela thread do modelo no modo pipeline → acesso protegido por lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS tm (
+                engine TEXT NOT NULL,
+                src TEXT NOT NULL,
+                tgt TEXT NOT NULL,
+                text TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (engine, src, tgt, text)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS tm_last_used ON tm(last_used)")
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+
+    # ------------------------------------------------------------
+    # Consulta / gravação
+    # ------------------------------------------------------------
+    def get(self, key):
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                self.lru_hits += 1
+                return self._lru[key]
+
+            row = self._db.execute(
+                "SELECT translation FROM tm WHERE engine=? AND src=? AND tgt=? AND text=?",
+                key
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._db.execute(
+                "UPDATE tm SET last_used=? WHERE engine=? AND src=? AND tgt=? AND text=?",
+                (time.time(), *key)
+            )
+            self._db.commit()
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key, translation):
+        with self._lock:
+            exists = self._db.execute(
+                "SELECT 1 FROM tm WHERE engine=? AND src=? AND tgt=? AND text=?",
+                key
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO tm (engine, src, tgt, text, translation, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, translation, time.time())
+            )
+            self._db.commit()
+            if not exists:
+                self._count += 1
+            self._remember(key, translation)
+
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _remember(self, key, translation):
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _evict(self):
+        # Remove os 10% menos usados de uma vez (evita apagar a cada inserção)
+        n = max(1, self._count - int(self.max_entries * 0.9))
+        self._db.execute(
+            "DELETE FROM tm WHERE rowid IN (SELECT rowid FROM tm ORDER BY last_used LIMIT ?)",
+            (n,)
+        )
+        self._db.commit()
+        self.evictions += n
+        self._count = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+        self._lru.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "lru_hits": self.lru_hits,
+            "evictions": self.evictions,
+            "entries": self._count,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachedTranslator:
+    """
+    Envolve TranslatorGoogle/TranslatorNLLB e consulta a memória antes do motor.
+    Qualquer outro atributo (count_tokens, tokenizer...) é repassado ao tradutor original.
+    """
+
+    def __init__(self, inner, memory, engine, src_lang, tgt_lang):
+        self.inner = inner
+        self.memory = memory
+        self.engine = engine
+        self.src_lang = src_lang
+        self.tgt_lang = tgt_lang
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _key(self, normalized):
+        return (self.engine, self.src_lang, self.tgt_lang, normalized)
+
+    def translate(self, text):
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts):
+        normalized = [normalize_text(t) for t in texts]
+        found = {}
+        missing = []
+
+        for norm in normalized:
+            if not norm or norm in found or norm in missing:
+                continue
+            cached = self.memory.get(self._key(norm))
+            if cached is None:
+                missing.append(norm)
+            else:
+                found[norm] = cached
+
+        if missing:
+            for norm, translated in zip(missing, self.inner.translate_batch(missing)):
+                found[norm] = translated
+                # Tradução vazia ou igual ao original (com letras) = provável falha do motor
+                if translated and (translated != norm or not _has_letters(norm)):
+                    self.memory.put(self._key(norm), translated)
+
+        return [found.get(norm, "") for norm in normalized]
+
+
+# ------------------------------------------------------------
+# Instância compartilhada por todos os tradutores
+# ------------------------------------------------------------
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    global _memory
+    if not config.TRANSLATION_MEMORY_ENABLED:
+        return None
+
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory(
+                config.TRANSLATION_MEMORY_PATH,
+                max_entries=config.TRANSLATION_MEMORY_MAX_ENTRIES,
+                lru_size=config.TRANSLATION_MEMORY_LRU_SIZE,
+            )
+        return _memory
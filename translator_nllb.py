@@ -1,60 +1,272 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import itertools
 import os
-from deep_translator import GoogleTranslator
+import threading
+import time
+from contextlib import nullcontext
+
 import config  # Importa o módulo de configuração inteiro
+from translation_memory import CachedTranslator, get_translation_memory
+
+# torch / transformers / deep_translator só são importados quando o motor
+# correspondente é usado pela primeira vez (o modo Google não carrega o torch)
 
 # Caminho do modelo local
 MODEL_DIR = os.getenv("NLLB_MODEL_DIR", r"C:\Users\Henrique\Downloads\NLLB_200")
 
+# -------------------------------------------------------------
+# 📦 Modelos carregados: um por (pasta, dispositivo, dtype) no processo
+# -------------------------------------------------------------
+class LoadedModel:
+    """Modelo NLLB já carregado, com quanto custou carregá-lo (tempo e memória)."""
+
+    def __init__(self, model_dir, device, dtype, model, load_seconds):
+        self.model_dir = model_dir
+        self.device = device
+        self.dtype = dtype
+        self.model = model
+        self.load_seconds = load_seconds
+        self.memory_bytes = _model_bytes(model)
+        self.uses = 0
+
+    def describe(self):
+        return (f"{os.path.basename(os.path.normpath(self.model_dir))} ({self.device}, {self.dtype}) • "
+                f"carregado em {self.load_seconds:.1f}s • {self.memory_bytes / 1e9:.2f} GB • "
+                f"{self.uses} uso(s)")
+
+
+def _model_bytes(model):
+    """Parâmetros + buffers + pesos int8 empacotados das camadas quantizadas."""
+    import torch
+
+    total = sum(t.numel() * t.element_size() for t in itertools.chain(model.parameters(), model.buffers()))
+    # Só as Linear dinâmicas: o filho LinearPackedParams também tem _packed_params,
+    # mas não tem weight()/bias()
+    for module in model.modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            for t in module._packed_params._weight_bias():
+                if t is not None:
+                    total += t.numel() * t.element_size()
+    return total
+
+
+_models = {}
+_tokenizers = {}
+_registry_lock = threading.Lock()
+
+
+def default_device(device=None):
+    """
+    (dispositivo, dtype) padrão: GPU em float16 quando houver (ou NLLB_DEVICE="cuda");
+    na CPU, int8 dinâmico com NLLB_CPU_QUANTIZE, senão float32.
+    """
+    import torch
+
+    device = device or config.NLLB_DEVICE
+    if device == "auto":
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    if device == "cuda":
+        return "cuda", "float16"
+    return "cpu", "qint8" if config.NLLB_CPU_QUANTIZE else "float32"
+
+
+def cpu_threads(workers=None):
+    """
+    Threads do torch na CPU. Com workers > 1 (processos do pool da execução;
+    padrão: PAGE_WORKERS) os processos fazem OCR/desenho enquanto o processo
+    principal traduz: cada um fica com um núcleo.
+    """
+    if config.NLLB_CPU_THREADS:
+        return config.NLLB_CPU_THREADS
+    cores = os.cpu_count() or 1
+    workers = (config.PAGE_WORKERS if workers is None else workers) or 1
+    return cores if workers <= 1 else max(1, cores - workers)
+
+
+def _configure_cpu(torch, workers=None):
+    threads = cpu_threads(workers)
+    torch.set_num_threads(threads)
+    try:
+        # generate() é sequencial: paralelismo só dentro de cada operação
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # só pode ser definido antes do primeiro trabalho paralelo do processo
+    return threads
+
+
+def get_nllb_model(model_dir=None, device=None, dtype=None, workers=None):
+    """
+    LoadedModel compartilhado por todos os tradutores do processo: o
+    from_pretrained roda só na primeira vez para cada (pasta, dispositivo, dtype).
+
+    workers: processos de OCR/desenho da execução que vai usar o modelo; na CPU,
+    as threads do torch são ajustadas a cada chamada (ver cpu_threads).
+
+    dtype "qint8" (só CPU): carrega em float32 e aplica quantize_dynamic nas
+    camadas Linear (pesos int8, ativações quantizadas na hora).
+    """
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+
+    model_dir = model_dir or MODEL_DIR
+    if dtype is None:
+        device, dtype = default_device(device)
+    elif device is None:
+        device = default_device()[0]
+    key = (os.path.abspath(model_dir), device, dtype)
+
+    with _registry_lock:
+        loaded = _models.get(key)
+        if loaded is None:
+            print(f"🔄 Carregando modelo NLLB-200 local ({device}, {dtype})...")
+        if device == "cpu":
+            print(f"🧵 torch na CPU com {_configure_cpu(torch, workers)} threads")
+
+        if loaded is None:
+            start = time.perf_counter()
+            quantize = dtype == "qint8"
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                model_dir,
+                local_files_only=True,
+                torch_dtype=torch.float32 if quantize else getattr(torch, dtype),
+                device_map="auto" if device == "cuda" else None
+            )
+            if device != "cuda":
+                model.to(device)
+            model.eval()
+            if quantize:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+            loaded = _models[key] = LoadedModel(model_dir, device, dtype, model, time.perf_counter() - start)
+            print(f"✅ Modelo pronto: {loaded.describe()}")
+        else:
+            print(f"♻️ Reaproveitando modelo já carregado: {loaded.describe()}")
+
+        loaded.uses += 1
+        return loaded
+
+
+def get_nllb_tokenizer(model_dir=None, src_lang=None):
+    """Tokenizer por (pasta, idioma de origem): src_lang fica fixo em cada instância."""
+    from transformers import AutoTokenizer
+
+    model_dir = model_dir or MODEL_DIR
+    key = (os.path.abspath(model_dir), src_lang)
+
+    with _registry_lock:
+        tokenizer = _tokenizers.get(key)
+        if tokenizer is None:
+            tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
+            try:
+                tokenizer.src_lang = src_lang
+            except:
+                pass
+            _tokenizers[key] = tokenizer
+        return tokenizer
+
+
+def loaded_models():
+    """Modelos carregados no processo (para mostrar tempo de carga e memória)."""
+    with _registry_lock:
+        return list(_models.values())
+
+
 # --- Classe para Tradução Local (NLLB) ---
 class TranslatorNLLB:
-    def __init__(self, src_lang, tgt_lang="por_Latn"):
-        print(f"🔄 Carregando modelo NLLB-200 local ({src_lang})...")
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        
+    def __init__(self, src_lang, tgt_lang="por_Latn", model_dir=None, device=None, dtype=None,
+                 num_beams=None, workers=None, slot=None):
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR, local_files_only=True)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(
-                MODEL_DIR,
-                local_files_only=True,
-                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                device_map="auto" if torch.cuda.is_available() else None
-            )
+            self.loaded = get_nllb_model(model_dir, device, dtype, workers)
+            self.tokenizer = get_nllb_tokenizer(model_dir, src_lang)
         except Exception as e:
             print(f"❌ Erro ao carregar NLLB local: {e}")
             raise e
 
-        if not torch.cuda.is_available():
-            self.model.to(self.device)
-
+        self.model = self.loaded.model
+        self.device = self.loaded.device
         self.src_lang = src_lang
         self.tgt_lang = tgt_lang
-        
-        try:
-            self.tokenizer.src_lang = self.src_lang
-        except:
-            pass
+        self.num_beams = num_beams or config.NLLB_NUM_BEAMS
+        # Adquirido só durante o generate (limita quantos capítulos usam o modelo juntos)
+        self.slot = slot or nullcontext()
+
+    @property
+    def variant(self):
+        """
+        O que muda o texto gerado além do modelo (dtype, decodificação), para a
+        memória de tradução não misturar saídas. Vazio na configuração original.
+        """
+        parts = []
+        if self.loaded.dtype == "qint8":
+            parts.append("int8")
+        if self.num_beams != 4:
+            parts.append("greedy" if self.num_beams == 1 else f"beams{self.num_beams}")
+        return ":".join(parts)
+
+    def max_length_for(self, input_len):
+        """Limite de tokens da saída derivado do maior texto do lote."""
+        return min(config.NLLB_MAX_LENGTH,
+                   int(input_len * config.NLLB_LENGTH_RATIO) + config.NLLB_LENGTH_EXTRA)
 
     def translate(self, text):
         text = text.strip()
         if not text: return ""
-        
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True).to(self.model.device)
-        with torch.no_grad():
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts, max_batch_size=None):
+        """
+        Traduz uma lista de textos com o menor número possível de chamadas ao generate.
+        Os textos são ordenados pelo tamanho em tokens e agrupados em lotes de até
+        max_batch_size, para que o padding de cada lote seja mínimo.
+        Retorna as traduções na mesma ordem da entrada.
+        """
+        max_batch_size = max_batch_size or config.TRANSLATION_BATCH_SIZE
+        results = [""] * len(texts)
+
+        pending = [(i, t.strip()) for i, t in enumerate(texts) if t and t.strip()]
+        if not pending:
+            return results
+
+        # Tokeniza tudo uma única vez (sem padding) para saber o tamanho de cada texto
+        encoded = self.tokenizer([t for _, t in pending], truncation=True)
+        order = sorted(range(len(pending)), key=lambda k: len(encoded["input_ids"][k]))
+
+        with self.slot:
+            for start in range(0, len(order), max_batch_size):
+                chunk = order[start:start + max_batch_size]
+                features = [
+                    {"input_ids": encoded["input_ids"][k], "attention_mask": encoded["attention_mask"][k]}
+                    for k in chunk
+                ]
+                # Padding apenas até o maior texto do lote
+                inputs = self.tokenizer.pad(features, padding=True, return_tensors="pt").to(self.model.device)
+                for k, translated in zip(chunk, self._generate(inputs)):
+                    results[pending[k][0]] = translated
+
+        return results
+
+    def count_tokens(self, text):
+        """Quantidade de tokens do texto (usado para montar lotes por orçamento de tokens)."""
+        return len(self.tokenizer(text.strip(), truncation=True)["input_ids"])
+
+    def _generate(self, inputs):
+        import torch
+
+        with torch.inference_mode():
             output = self.model.generate(
                 **inputs,
                 forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(self.tgt_lang),
-                max_length=256,
-                num_beams=4,
-                early_stopping=True
+                max_length=self.max_length_for(inputs["input_ids"].shape[1]),
+                num_beams=self.num_beams,
+                early_stopping=self.num_beams > 1
             )
-        return self.tokenizer.batch_decode(output, skip_special_tokens=True)[0]
+        return self.tokenizer.batch_decode(output, skip_special_tokens=True)
 
 # --- Classe Wrapper para Google Tradutor ---
 class TranslatorGoogle:
     def __init__(self, src_lang_code):
         # Mapeia códigos do seu menu para códigos do Google
+        from deep_translator import GoogleTranslator
+
         self.source = src_lang_code 
         self.translator = GoogleTranslator(source=self.source, target='pt')
 
@@ -66,9 +278,24 @@ class TranslatorGoogle:
             print(f"⚠️ Erro no Google Translate: {e}")
             return text
 
+    def translate_batch(self, texts):
+        """
+        O deep_translator não tem endpoint de lote de verdade,
+        então traduz um por um mantendo o fallback individual de translate().
+        """
+        return [self.translate(t) for t in texts]
+
 # --- Função Principal de Escolha ---
-def get_translator(choice):
+def get_translator(choice, engine=None, workers=None, model_slot=None):
+    """
+    Retorna (tradutor, código do OCR) para o idioma escolhido.
+    engine: "google" ou "huggingface" (padrão: config.TRANSLATION_MODE)
+    workers: processos de OCR/desenho da execução (divide os núcleos com o NLLB na CPU)
+    model_slot: context manager adquirido em cada chamada ao modelo NLLB
+                (o Google e os acertos da memória de tradução não esperam por ele)
+    """
     choice = str(choice).strip()
+    engine = engine or config.TRANSLATION_MODE
     
     # Define códigos de idioma para cada motor
     if choice == "1":   # Japonês
@@ -85,9 +312,20 @@ def get_translator(choice):
         ocr_code = "eng"
 
     # Verifica a configuração (que será alterada dinamicamente pelo main.py)
-    if config.TRANSLATION_MODE == "google":
+    if engine == "google":
         print(f"🌍 Usando Google Translator (Online) - Origem: {google_lang}")
-        return TranslatorGoogle(google_lang), ocr_code
+        translator = TranslatorGoogle(google_lang)
+        engine, src, tgt = "google", google_lang, "pt"
     else:
         print(f"🤖 Usando IA Local (NLLB) - Origem: {nllb_lang}")
-        return TranslatorNLLB(nllb_lang, "por_Latn"), ocr_code
\ No newline at end of file
+        translator = TranslatorNLLB(nllb_lang, "por_Latn", workers=workers, slot=model_slot)
+        engine, src, tgt = f"nllb:{os.path.basename(os.path.normpath(MODEL_DIR))}", nllb_lang, "por_Latn"
+        if translator.variant:
+            engine = f"{engine}:{translator.variant}"
+
+    # Memória de tradução compartilhada pelos dois motores
+    memory = get_translation_memory()
+    if memory is not None:
+        translator = CachedTranslator(translator, memory, engine, src, tgt)
+
+    return translator, ocr_code
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import shutil
+import stat
+import tempfile
+
+import config
+
+CLEANUP_POLICIES = ("always", "on_success", "never")
+
+# Memória compartilhada do Linux (tmpfs): I/O das páginas sem tocar o disco
+TMPFS_DIR = "/dev/shm"
+
+
+def _remove_readonly(func, path, _):
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+class Workspace:
+    """
+    Pastas de trabalho de UMA execução (um capítulo):
+        root/pages → imagens baixadas
+        root/out   → páginas traduzidas
+
+    Cada execução tem a sua, então vários capítulos podem rodar ao mesmo tempo
+    na mesma máquina sem apagar os arquivos uns dos outros.
+
+    cleanup: "always" (apaga no fim), "on_success" (mantém se deu erro, para depurar)
+             ou "never"
+    tmpfs:   cria a pasta em /dev/shm quando existir
+    """
+
+    def __init__(self, root=None, name=None, tmpfs=None, cleanup=None,
+                 download_dir=None, output_dir=None):
+        tmpfs = config.WORKSPACE_TMPFS if tmpfs is None else tmpfs
+        cleanup = cleanup or config.WORKSPACE_CLEANUP
+        if cleanup not in CLEANUP_POLICIES:
+            raise ValueError(f"Política de limpeza inválida: {cleanup}")
+
+        # Raiz criada aqui → pode ser apagada inteira no fim
+        self._owned = root is None
+
+        if root is None:
+            base = config.WORKSPACE_ROOT
+            if tmpfs and os.path.isdir(TMPFS_DIR):
+                base = TMPFS_DIR
+            if base:
+                os.makedirs(base, exist_ok=True)
+            root = tempfile.mkdtemp(prefix=f"{name or 'capitulo'}_", dir=base)
+
+        self.root = root
+        self.cleanup = cleanup
+        self.download_dir = download_dir or os.path.join(root, "pages")
+        self.output_dir = output_dir or os.path.join(root, "out")
+
+        os.makedirs(self.download_dir, exist_ok=True)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    @classmethod
+    def legacy(cls):
+        """As pastas globais antigas (TEMP_FOLDER / TEMP_OUT), nunca apagadas no fim."""
+        return cls(root=os.getcwd(), cleanup="never",
+                   download_dir=config.TEMP_FOLDER, output_dir=config.TEMP_OUT)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.cleanup == "always" or (self.cleanup == "on_success" and exc_type is None):
+            self.remove()
+        return False
+
+    def __repr__(self):
+        return f"Workspace({self.root!r})"
+
+    # ------------------------------------------------------------
+    # Caminhos
+    # ------------------------------------------------------------
+    def output_path_for(self, image_path):
+        """Página traduzida: mesmo nome da original, dentro de output_dir."""
+        return os.path.join(self.output_dir, os.path.basename(image_path))
+
+    def reset_downloads(self):
+        """Esvazia só a pasta de downloads DESTA execução."""
+        if os.path.exists(self.download_dir):
+            shutil.rmtree(self.download_dir, onerror=_remove_readonly)
+        os.makedirs(self.download_dir, exist_ok=True)
+
+    def remove(self):
+        if self._owned:
+            shutil.rmtree(self.root, onerror=_remove_readonly)
+            return
+        for folder in (self.download_dir, self.output_dir):
+            if os.path.exists(folder):
+                shutil.rmtree(folder, onerror=_remove_readonly)